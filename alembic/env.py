@@ -6,8 +6,18 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.auth.models import RefreshToken, PasswordResetCodes
-from app.evaluations.models import Evaluation, ClinicData, ClinicResults, MRIImage
+from app.evaluations.models import (
+    Evaluation,
+    ClinicData,
+    ClinicResults,
+    InferenceCache,
+    MRIImage,
+)
+from app.imports.models import ImportJob
+from app.outbox.models import OutboxEmail
 from app.patients.models import Patient
+from app.reports.models import ReportJob
+from app.storage.models import StoredBlob
 from app.users.models import User
 
 from app.core.database import engine
@@ -0,0 +1,41 @@
+"""Indices para paginación por cursor
+
+Revision ID: 0ee91d66102b
+Revises: b8a7dff0b5c2
+Create Date: 2026-10-17 09:12:41.104233
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0ee91d66102b"
+down_revision: Union[str, None] = "b8a7dff0b5c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_patient_user_id_created_at_id",
+        "patient",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_evaluation_created_at_id",
+        "evaluation",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_evaluation_created_at_id", table_name="evaluation")
+    op.drop_index("ix_patient_user_id_created_at_id", table_name="patient")
@@ -0,0 +1,71 @@
+"""Indices trigram para búsqueda de pacientes
+
+Revision ID: 5c1e7a92d4f3
+Revises: 0ee91d66102b
+Create Date: 2026-10-17 10:03:18.552917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e7a92d4f3"
+down_revision: Union[str, None] = "0ee91d66102b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # DNI uniqueness used to be checked only in app code (check-then-insert),
+    # so concurrent creates may have left duplicates behind. Merging patients
+    # means choosing whose evaluations survive, which is not ours to decide.
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT user_id, dni, count(*) AS copies FROM patient "
+                "GROUP BY user_id, dni HAVING count(*) > 1 "
+                "ORDER BY user_id, dni LIMIT 20"
+            )
+        )
+        .all()
+    )
+    if duplicates:
+        listed = ", ".join(
+            f"user_id={row.user_id} dni={row.dni} ({row.copies} rows)"
+            for row in duplicates
+        )
+        raise RuntimeError(
+            "Cannot create the unique index ix_patient_user_id_dni: some users "
+            f"have several patients with the same DNI: {listed}. Merge or "
+            "delete the duplicates and run the migration again."
+        )
+    op.create_index(
+        "ix_patient_user_id_dni", "patient", ["user_id", "dni"], unique=True
+    )
+    op.create_index(
+        "ix_patient_full_name_trgm",
+        "patient",
+        [sa.text("(name || ' ' || last_name) gin_trgm_ops")],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_patient_dni_trgm",
+        "patient",
+        ["dni"],
+        postgresql_using="gin",
+        postgresql_ops={"dni": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_patient_dni_trgm", table_name="patient")
+    op.drop_index("ix_patient_full_name_trgm", table_name="patient")
+    op.drop_index("ix_patient_user_id_dni", table_name="patient")
@@ -0,0 +1,67 @@
+"""Importación de pacientes y datos clínicos desde planillas
+
+Revision ID: 6b0d3e8f2a19
+Revises: e5a93c17b4d2
+Create Date: 2026-10-17 18:12:44.902513
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b0d3e8f2a19"
+down_revision: Union[str, None] = "e5a93c17b4d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "importjob",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "filename", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False
+        ),
+        sa.Column(
+            "storage_key", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False
+        ),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "RUNNING", "DONE", "FAILED", name="importstatus"),
+            nullable=False,
+        ),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("processed_rows", sa.Integer(), nullable=False),
+        sa.Column("created_patients", sa.Integer(), nullable=False),
+        sa.Column("updated_patients", sa.Integer(), nullable=False),
+        sa.Column("created_evaluations", sa.Integer(), nullable=False),
+        sa.Column("row_errors", sa.JSON(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_importjob_status_locked_at",
+        "importjob",
+        ["status", "locked_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_importjob_status_locked_at", table_name="importjob")
+    op.drop_table("importjob")
+    sa.Enum(name="importstatus").drop(op.get_bind(), checkfirst=True)
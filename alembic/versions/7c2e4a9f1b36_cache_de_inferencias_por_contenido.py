@@ -0,0 +1,59 @@
+"""Cache de inferencias por contenido de imagen
+
+Revision ID: 7c2e4a9f1b36
+Revises: 3f8b1c5d9e27
+Create Date: 2026-10-17 14:05:13.480221
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e4a9f1b36"
+down_revision: Union[str, None] = "3f8b1c5d9e27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "inferencecache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "content_hash", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False
+        ),
+        sa.Column(
+            "model_version", sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False
+        ),
+        sa.Column(
+            "classification",
+            # the type already exists, created with the evaluation table
+            postgresql.ENUM(name="classification", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("probability", sa.Numeric(precision=6, scale=3), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_inferencecache_content_hash_model_version",
+        "inferencecache",
+        ["content_hash", "model_version"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_inferencecache_content_hash_model_version", table_name="inferencecache"
+    )
+    op.drop_table("inferencecache")
@@ -0,0 +1,58 @@
+"""Almacenamiento de imágenes por contenido con conteo de referencias
+
+Revision ID: d41f6e2a8c05
+Revises: 7c2e4a9f1b36
+Create Date: 2026-10-17 15:22:40.118734
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41f6e2a8c05"
+down_revision: Union[str, None] = "7c2e4a9f1b36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "storedblob",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("refcount", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.add_column(
+        "mriimage",
+        sa.Column(
+            "storage_key", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True
+        ),
+    )
+    # existing images keep their name: it is the last segment of the url
+    op.execute("UPDATE mriimage SET storage_key = regexp_replace(url, '^.*/', '')")
+    op.execute(
+        "INSERT INTO storedblob (key, refcount, created_at, updated_at) "
+        "SELECT storage_key, count(*), now(), now() FROM mriimage "
+        "GROUP BY storage_key"
+    )
+    op.alter_column("mriimage", "storage_key", nullable=False)
+    op.create_index(
+        op.f("ix_mriimage_storage_key"), "mriimage", ["storage_key"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_mriimage_storage_key"), table_name="mriimage")
+    op.drop_column("mriimage", "storage_key")
+    op.drop_table("storedblob")
@@ -0,0 +1,29 @@
+"""Renditions reducidas de imágenes MRI
+
+Revision ID: e5a93c17b4d2
+Revises: d41f6e2a8c05
+Create Date: 2026-10-17 16:08:27.553016
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a93c17b4d2"
+down_revision: Union[str, None] = "d41f6e2a8c05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("mriimage", sa.Column("renditions", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("mriimage", "renditions")
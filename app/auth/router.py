@@ -1,8 +1,8 @@
 from ..core.config import config
-from ..core.database import SessionDep
-from ..users.service import UserService
+from ..core.database import SessionDep, service_reader
+from ..users.service import AsyncUserService, UserService, user_cache
 from .schemas import UserForCreate
-from .service import AuthService
+from .service import AsyncAuthService, AuthService
 from .utils import create_token, decode_token, TokenData, TokenType
 from fastapi import APIRouter, HTTPException, Response, Request
 from fastapi import Depends
@@ -23,6 +23,13 @@ def get_auth_service(session: SessionDep) -> AuthService:
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 auth_service_dependency = Annotated[AuthService, Depends(get_auth_service)]
 user_service_dependency = Annotated[UserService, Depends(get_user_service)]
+# awaitable services for async handlers (AsyncSession when DB_ASYNC is set)
+async_user_service_dependency = Annotated[
+    AsyncUserService, Depends(service_reader(UserService, AsyncUserService))
+]
+async_auth_service_dependency = Annotated[
+    AsyncAuthService, Depends(service_reader(AuthService, AsyncAuthService))
+]
 auth2request_dependency = Annotated[OAuth2PasswordRequestForm, Depends()]
 auth2_scheme_dependency = Annotated[str, Depends(oauth2_scheme)]
 
@@ -39,11 +46,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> TokenData:
 current_user_dependency = Annotated[TokenData, Depends(get_current_user)]
 
 
-def get_current_user_info(
-    tokendata: current_user_dependency,
-    service: user_service_dependency,
-    request: Request = None,
-):
+def _token_user_id(tokendata: TokenData, request: Request) -> int:
     refresh = request.cookies.get(TokenType.refresh.value)
     if not refresh:
         raise HTTPException(status_code=401, detail="Refresh token not found")
@@ -51,9 +54,38 @@ def get_current_user_info(
     user_id = int(user_id) if user_id.isdigit() else None
     if user_id is None:
         raise HTTPException(status_code=400, detail="Invalid user ID in token")
+    return user_id
+
+
+def get_current_user_info(
+    tokendata: current_user_dependency,
+    service: user_service_dependency,
+    request: Request = None,
+):
+    user_id = _token_user_id(tokendata, request)
+    cached_user_id = user_cache.get(user_id)
+    if cached_user_id is not None:
+        return cached_user_id
     user = service.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    user_cache.set(user_id, user.id)
+    return user.id
+
+
+async def get_current_user_info_async(
+    tokendata: current_user_dependency,
+    service: async_user_service_dependency,
+    request: Request,
+):
+    user_id = _token_user_id(tokendata, request)
+    cached_user_id = user_cache.get(user_id)
+    if cached_user_id is not None:
+        return cached_user_id
+    user = await service.get_user(user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user_cache.set(user_id, user.id)
     return user.id
 
 
@@ -115,7 +147,7 @@ def login(
 
 
 @auth_router.post("/refresh")
-def refresh_token(request: Request, service: auth_service_dependency):
+async def refresh_token(request: Request, service: async_auth_service_dependency):
     refresh_token = request.cookies.get("refresh")
 
     if not refresh_token:
@@ -129,7 +161,7 @@ def refresh_token(request: Request, service: auth_service_dependency):
     )
 
     user_id = decoded_token.sub
-    service.validate_refresh_token(
+    await service.validate_refresh_token(
         jti=decoded_token.jti,
         user_agent=request.headers.get("User-Agent", "Unknown"),
         ip_address=request.client.host,
@@ -1,32 +1,61 @@
-from ..utils import CRUDDraft
+from ..utils import AsyncService, CRUDDraft
 from ..users.models import User
+from ..users.service import user_cache
 from .models import RefreshToken, PasswordResetCodes
 from .schemas import UserForCreate
 from sqlmodel import Session, select
 from fastapi import HTTPException
-from .utils import hash_password, verify_password
+from .utils import hash_password, verify_and_update_password
 from datetime import datetime, timezone
 from uuid import uuid4, UUID
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from ..core.config import config
+from ..outbox.service import OutboxService
 from fastapi import HTTPException
 from datetime import timezone
 
 
+def _check_refresh_token(
+    refresh_token: RefreshToken | None, user_agent: str, ip_address: str
+) -> bool:
+    """Raise if the refresh token can't be used; return True if it expired.
+
+    An expired token is revoked by the caller before it is rejected.
+    """
+    if not refresh_token:
+        raise HTTPException(status_code=404, detail="Refresh token not found")
+    if refresh_token.revoked:
+        raise HTTPException(status_code=400, detail="Refresh token has been revoked")
+    expires_at = refresh_token.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if expires_at < datetime.now(timezone.utc):
+        return True
+    if refresh_token.user_agent != user_agent:
+        raise HTTPException(status_code=400, detail="User agent mismatch")
+    if refresh_token.ip_address != ip_address:
+        raise HTTPException(status_code=400, detail="IP address mismatch")
+    return False
+
+
 class AuthService:
     def __init__(self, session: Session):
         self.session = session
         self.crud = CRUDDraft(session)
-        self.send_email_service = SendEmailService()
+        self.send_email_service = SendEmailService(session)
 
     def authenticate_user(self, email, password) -> User | None:
         user = self.get_user_by_email(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        if not verify_password(password, user.password):
+        valid, new_hash = verify_and_update_password(password, user.password)
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid password")
+        if new_hash:
+            # stored hash predates the current bcrypt cost; upgrade it
+            user.password = new_hash
+            self.crud.update(user.id, User, user)
         return user
 
     def create_user(self, user_data: UserForCreate) -> User:
@@ -79,23 +108,9 @@ class AuthService:
         self, jti: str, user_agent: str, ip_address: str
     ) -> RefreshToken | None:
         refresh_token = self.get_refresh_token(jti)
-        if not refresh_token:
-            raise HTTPException(status_code=404, detail="Refresh token not found")
-        if refresh_token.revoked:
-            raise HTTPException(
-                status_code=400, detail="Refresh token has been revoked"
-            )
-        expires_at = refresh_token.expires_at
-        if expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-
-        if expires_at < datetime.now(timezone.utc):
+        if _check_refresh_token(refresh_token, user_agent, ip_address):
             self.revoke_refresh_token(jti)
             raise HTTPException(status_code=400, detail="Refresh token has expired")
-        if refresh_token.user_agent != user_agent:
-            raise HTTPException(status_code=400, detail="User agent mismatch")
-        if refresh_token.ip_address != ip_address:
-            raise HTTPException(status_code=400, detail="IP address mismatch")
 
     def create_recover_password(self, email: str) -> None:
         user = self.get_user_by_email(email)
@@ -145,10 +160,42 @@ class AuthService:
                 detail="New password and verify new password do not match",
             )
         user.password = hash_password(new_password)
-        return self.crud.update(user.id, User, user)
+        user = self.crud.update(user.id, User, user)
+        user_cache.invalidate(user.id)
+        return user
+
+
+class AsyncAuthService(AsyncService):
+    """The token lookups of ``AuthService`` on the AsyncSession.
+
+    /auth/refresh runs on every access-token renewal; login, sign-up and
+    password recovery stay on the sync service (bcrypt dominates there).
+    """
+
+    async def get_refresh_token(self, jti: str) -> RefreshToken | None:
+        statement = select(RefreshToken).where(RefreshToken.jti == jti)
+        return (await self.session.exec(statement)).first()
+
+    async def revoke_refresh_token(self, jti: str) -> None:
+        refresh_token = await self.get_refresh_token(jti)
+        if not refresh_token:
+            raise HTTPException(status_code=404, detail="Refresh token not found")
+        refresh_token.revoked = True
+        await self.crud.update(refresh_token.id, RefreshToken, refresh_token)
+
+    async def validate_refresh_token(
+        self, jti: str, user_agent: str, ip_address: str
+    ) -> RefreshToken | None:
+        refresh_token = await self.get_refresh_token(jti)
+        if _check_refresh_token(refresh_token, user_agent, ip_address):
+            await self.revoke_refresh_token(jti)
+            raise HTTPException(status_code=400, detail="Refresh token has expired")
 
 
 class SendEmailService:
+    def __init__(self, session: Session):
+        self.outbox = OutboxService(session)
+
     def send_recovery_email(self, email: str, code: str) -> None:
         msg = MIMEMultipart()
         msg["Subject"] = "Password Reset Code Intellicog"
@@ -162,9 +209,7 @@ class SendEmailService:
         html = html.replace("{{code}}", code)
         msg.attach(MIMEText(html, "html", "utf-8"))
 
-        with smtplib.SMTP_SSL(config["EMAIL_HOST"], config["EMAIL_PORT"]) as smtp:
-            smtp.login(config["EMAIL_SENDER"], config["EMAIL_PASSWORD"])
-            smtp.sendmail(config["EMAIL_SENDER"], [email], msg.as_string())
+        self.outbox.enqueue(msg, email)
 
     def load_html_template(self, template_path: str) -> str:
         try:
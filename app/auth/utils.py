@@ -2,6 +2,8 @@ from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from ..core.config import config
+from ..core.executors import BoundedProcessPool
 from .schemas import TokenData
 
 from enum import Enum
@@ -64,11 +66,41 @@ def decode_token(
     return TokenData(sub=user_id, exp=exp, jti=jti)
 
 
-def hash_password(password: str) -> str:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# built once per process; hashes made with other rounds are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=config["BCRYPT_ROUNDS"]
+)
+
+# bcrypt runs in worker processes so logins don't hold request threads or the GIL
+password_pool = BoundedProcessPool(
+    name="password hashing",
+    max_workers=config["PASSWORD_HASH_WORKERS"],
+    max_pending=config["PASSWORD_HASH_MAX_PENDING"],
+    retry_after=config["PASSWORD_HASH_RETRY_AFTER_SECONDS"],
+)
+
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return password_pool.call(_hash, password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Return whether the password matches and, if the stored hash uses
+    outdated parameters, a replacement hash to persist."""
+    return password_pool.call(_verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Request, Response, status
+from typing import Annotated, Any
+import hashlib
+
+
+class ConditionalGet:
+    """Validators for JSON reads, derived from ``DraftModel.updated_at``.
+
+    ``check`` puts a weak ETag and ``Last-Modified`` on the response and,
+    when the client's copy is still current, raises a 304 so the handler
+    stops before loading or serializing the body.
+
+    Lists and other composite responses use ``check_collection`` with the
+    ``max(updated_at)`` of their rows plus what else identifies them (row
+    count, page parameters, row ids). Deleting a row does not move that
+    maximum, so they get no ``Last-Modified`` and ignore
+    ``If-Modified-Since``; only the ETag, which covers the rest of the key,
+    validates them.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def check(self, updated_at: datetime | None, *key: Any) -> None:
+        self._check(updated_at, key, last_modified=True)
+
+    def check_collection(self, updated_at: datetime | None, *key: Any) -> None:
+        self._check(updated_at, key, last_modified=False)
+
+    def _check(
+        self, updated_at: datetime | None, key: tuple, last_modified: bool
+    ) -> None:
+        if updated_at is None:
+            return
+        if updated_at.tzinfo is None:
+            # DateTime columns store naive UTC
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        digest = hashlib.sha1(repr((updated_at.isoformat(), key)).encode())
+        etag = f'W/"{digest.hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if last_modified:
+            headers["Last-Modified"] = format_datetime(updated_at, usegmt=True)
+        if self._is_fresh(etag, updated_at if last_modified else None):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        self.response.headers.update(headers)
+
+    def _is_fresh(self, etag: str, updated_at: datetime | None) -> bool:
+        # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag.removeprefix("W/") in tags
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since is None or updated_at is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return updated_at.replace(microsecond=0) <= since
+
+
+ConditionalDep = Annotated[ConditionalGet, Depends()]
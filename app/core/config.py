@@ -1,4 +1,6 @@
 from dotenv import dotenv_values
+import os
+import tempfile
 
 config = dotenv_values(".env")
 config = {
@@ -12,9 +14,26 @@ config = {
     "REFRESH_SECRET": config.get("REFRESH_SECRET", "refresh"),
     "ENVIRONMENT": config.get("ENVIRONMENT", "development"),
     "CORS_ORIGINS": config.get("CORS_ORIGINS", "*"),
+    "METRICS_ENABLED": config.get("METRICS_ENABLED", "false").lower() == "true",
     "S3_BUCKET_NAME": config.get("S3_BUCKET_NAME", "intellicog-bucket"),
     "S3_REGION_NAME": config.get("S3_REGION_NAME", "us-west-2"),
     "S3_ACCESS_KEY_ID": config.get("S3_ACCESS_KEY_ID", "your-access-key-id"),
+    "S3_SECRET_ACCESS_KEY": config.get("S3_SECRET_ACCESS_KEY", ""),
+    "S3_ENDPOINT_URL": config.get("S3_ENDPOINT_URL") or None,
+    "STORAGE_DRIVER": config.get("STORAGE_DRIVER", "local"),
+    "STORAGE_LOCAL_ROOT": config.get(
+        "STORAGE_LOCAL_ROOT",
+        f"app/{config.get('S3_BUCKET_NAME', 'intellicog-bucket')}",
+    ),
+    "STORAGE_PUBLIC_URL": config.get(
+        "STORAGE_PUBLIC_URL",
+        "https://intellicog-api-production.up.railway.app/api/v1/"
+        f"{config.get('S3_BUCKET_NAME', 'intellicog-bucket')}",
+    ),
+    "STORAGE_CACHE_DIR": config.get(
+        "STORAGE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "intellicog-storage-cache"),
+    ),
     "ACCESS_TOKEN_EXPIRE_MINUTES": int(config.get("ACCESS_TOKEN_EXPIRE_MINUTES", 30)),
     "REFRESH_TOKEN_EXPIRE_HOURS": int(config.get("REFRESH_TOKEN_EXPIRE_HOURS", 3)),
     "ALGORITHM": config.get("ALGORITHM", "HS256"),
@@ -28,4 +47,81 @@ config = {
     "EMAIL_PASSWORD": config.get("EMAIL_PASSWORD", ""),
     "EMAIL_HOST": config.get("EMAIL_HOST", "smtp.gmail.com"),
     "EMAIL_PORT": int(config.get("EMAIL_PORT", 587)),
+    "EMAIL_USE_SSL": config.get("EMAIL_USE_SSL", "true").lower() == "true",
+    "OUTBOX_POLL_SECONDS": float(config.get("OUTBOX_POLL_SECONDS", 2)),
+    "OUTBOX_BATCH_SIZE": int(config.get("OUTBOX_BATCH_SIZE", 20)),
+    "OUTBOX_IDLE_SECONDS": float(config.get("OUTBOX_IDLE_SECONDS", 60)),
+    "OUTBOX_LEASE_SECONDS": int(config.get("OUTBOX_LEASE_SECONDS", 300)),
+    "OUTBOX_MAX_ATTEMPTS": int(config.get("OUTBOX_MAX_ATTEMPTS", 5)),
+    "OUTBOX_BACKOFF_SECONDS": int(config.get("OUTBOX_BACKOFF_SECONDS", 30)),
+    "DB_POOL_SIZE": int(config.get("DB_POOL_SIZE", 5)),
+    "DB_MAX_OVERFLOW": int(config.get("DB_MAX_OVERFLOW", 10)),
+    "DB_POOL_TIMEOUT": int(config.get("DB_POOL_TIMEOUT", 30)),
+    "DB_POOL_RECYCLE": int(config.get("DB_POOL_RECYCLE", 1800)),
+    "DB_POOL_PRE_PING": config.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    "DB_STATEMENT_TIMEOUT_MS": int(config.get("DB_STATEMENT_TIMEOUT_MS", 30000)),
+    "DB_ASYNC": config.get("DB_ASYNC", "false").lower() == "true",
+    "IMAGE_WORKERS": int(config.get("IMAGE_WORKERS", 2)),
+    "IMAGE_MAX_PENDING": int(config.get("IMAGE_MAX_PENDING", 8)),
+    "IMAGE_RETRY_AFTER_SECONDS": int(config.get("IMAGE_RETRY_AFTER_SECONDS", 5)),
+    "MRI_MAX_UPLOAD_BYTES": int(config.get("MRI_MAX_UPLOAD_BYTES", 25 * 1024 * 1024)),
+    "MRI_MAX_PIXELS": int(config.get("MRI_MAX_PIXELS", 64_000_000)),
+    "MRI_MAX_DIMENSION": int(config.get("MRI_MAX_DIMENSION", 4096)),
+    "MRI_RENDITION_SIZES": tuple(
+        int(size) for size in config.get("MRI_RENDITION_SIZES", "128,512").split(",")
+    ),
+    "MRI_WEBP_QUALITY": int(config.get("MRI_WEBP_QUALITY", 85)),
+    # larger scans get no full-size WebP (see generate_renditions)
+    "MRI_WEBP_FULL_MAX_PIXELS": int(
+        config.get("MRI_WEBP_FULL_MAX_PIXELS", 1024 * 1024)
+    ),
+    "CNN_MODEL_PATH": config.get("CNN_MODEL_PATH", ""),
+    "CNN_CLASSES": config.get(
+        "CNN_CLASSES", "Normal,MCI,Mild Dementia,Moderate Dementia"
+    ).split(","),
+    "CNN_INPUT_SIZE": int(config.get("CNN_INPUT_SIZE", 224)),
+    "CNN_THREADS": int(config.get("CNN_THREADS", 2)),
+    "CNN_MAX_BATCH": int(config.get("CNN_MAX_BATCH", 8)),
+    "CNN_BATCH_WAIT_MS": int(config.get("CNN_BATCH_WAIT_MS", 20)),
+    "CNN_MAX_PENDING": int(config.get("CNN_MAX_PENDING", 32)),
+    "CNN_RETRY_AFTER_SECONDS": int(config.get("CNN_RETRY_AFTER_SECONDS", 2)),
+    "INFERENCE_CACHE_MAXSIZE": int(config.get("INFERENCE_CACHE_MAXSIZE", 4096)),
+    "INFERENCE_CACHE_TTL_SECONDS": int(
+        config.get("INFERENCE_CACHE_TTL_SECONDS", 24 * 3600)
+    ),
+    "RF_MODEL_PATH": config.get("RF_MODEL_PATH", ""),
+    "REPORT_WORKERS": int(config.get("REPORT_WORKERS", 2)),
+    "REPORT_POLL_SECONDS": float(config.get("REPORT_POLL_SECONDS", 2)),
+    "REPORT_JOB_LEASE_SECONDS": int(config.get("REPORT_JOB_LEASE_SECONDS", 300)),
+    "REPORT_JOB_MAX_ATTEMPTS": int(config.get("REPORT_JOB_MAX_ATTEMPTS", 3)),
+    "PDF_CACHE_DIR": config.get(
+        "PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "intellicog-pdf-cache")
+    ),
+    "PDF_CACHE_MAX_BYTES": int(config.get("PDF_CACHE_MAX_BYTES", 200 * 1024 * 1024)),
+    "JINJA_BYTECODE_CACHE_DIR": config.get(
+        "JINJA_BYTECODE_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "intellicog-jinja-cache"),
+    ),
+    "BCRYPT_ROUNDS": int(config.get("BCRYPT_ROUNDS", 12)),
+    "PASSWORD_HASH_WORKERS": int(config.get("PASSWORD_HASH_WORKERS", 2)),
+    "PASSWORD_HASH_MAX_PENDING": int(config.get("PASSWORD_HASH_MAX_PENDING", 16)),
+    "PASSWORD_HASH_RETRY_AFTER_SECONDS": int(
+        config.get("PASSWORD_HASH_RETRY_AFTER_SECONDS", 2)
+    ),
+    "USER_CACHE_MAXSIZE": int(config.get("USER_CACHE_MAXSIZE", 1024)),
+    "USER_CACHE_TTL_SECONDS": int(config.get("USER_CACHE_TTL_SECONDS", 60)),
+    "BULK_MAX_ITEMS": int(config.get("BULK_MAX_ITEMS", 10000)),
+    "IMPORT_WORKERS": int(config.get("IMPORT_WORKERS", 1)),
+    "IMPORT_POLL_SECONDS": float(config.get("IMPORT_POLL_SECONDS", 2)),
+    "IMPORT_JOB_LEASE_SECONDS": int(config.get("IMPORT_JOB_LEASE_SECONDS", 300)),
+    "IMPORT_JOB_MAX_ATTEMPTS": int(config.get("IMPORT_JOB_MAX_ATTEMPTS", 3)),
+    "IMPORT_CHUNK_ROWS": int(config.get("IMPORT_CHUNK_ROWS", 5000)),
+    "IMPORT_MAX_UPLOAD_BYTES": int(
+        config.get("IMPORT_MAX_UPLOAD_BYTES", 50 * 1024 * 1024)
+    ),
+    "IMPORT_MAX_ROW_ERRORS": int(config.get("IMPORT_MAX_ROW_ERRORS", 1000)),
+    # uploaded spreadsheets hold patient data: they go under a private
+    # prefix that the static mount does not serve and that the bucket policy
+    # must not make public
+    "IMPORT_STORAGE_PREFIX": config.get("IMPORT_STORAGE_PREFIX", ".imports/"),
 }
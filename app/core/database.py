@@ -1,19 +1,159 @@
-from sqlmodel import Session, create_engine, SQLModel
-from fastapi import Depends
+from sqlmodel import Session, create_engine, SQLModel, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from fastapi import Depends, Request
+from threading import Lock
+from time import perf_counter
 from typing import Annotated
 from .config import config
+from ..utils import ThreadpoolService
 
 DB_URL = f"postgresql+psycopg://{config['PGUSER']}:{config['PGPASSWORD']}@{config['PGHOST']}:{config['PGPORT']}/{config['PGDATABASE']}"
-engine = create_engine(DB_URL)
 
 
-def get_session():
-    with Session(engine) as session:
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # keep counters across pool resets (e.g. after a dispose)
+        new_pool = super().recreate()
+        new_pool.checkouts = self.checkouts
+        new_pool.timeouts = self.timeouts
+        new_pool.wait_seconds_total = self.wait_seconds_total
+        new_pool.wait_seconds_max = self.wait_seconds_max
+        return new_pool
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checked_in": self.checkedin(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+connect_args = {}
+if config["DB_STATEMENT_TIMEOUT_MS"]:
+    connect_args["options"] = (
+        f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+    )
+
+engine = create_engine(
+    DB_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=config["DB_POOL_SIZE"],
+    max_overflow=config["DB_MAX_OVERFLOW"],
+    pool_timeout=config["DB_POOL_TIMEOUT"],
+    pool_recycle=config["DB_POOL_RECYCLE"],
+    pool_pre_ping=config["DB_POOL_PRE_PING"],
+    connect_args=connect_args,
+)
+
+
+def get_session(request: Request):
+    # one session (and at most one pooled connection) per request, even if
+    # several dependencies or helpers ask for it
+    session = getattr(request.state, "db_session", None)
+    if session is not None:
         yield session
+        return
+    with Session(engine) as session:
+        request.state.db_session = session
+        try:
+            yield session
+        finally:
+            request.state.db_session = None
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
 
+# psycopg 3 serves both drivers under the same URL; the async engine is only
+# built on deployments that opt in with DB_ASYNC
+async_engine = (
+    create_async_engine(
+        DB_URL,
+        pool_size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_MAX_OVERFLOW"],
+        pool_timeout=config["DB_POOL_TIMEOUT"],
+        pool_recycle=config["DB_POOL_RECYCLE"],
+        pool_pre_ping=config["DB_POOL_PRE_PING"],
+        connect_args=connect_args,
+    )
+    if config["DB_ASYNC"]
+    else None
+)
+
+
+async def get_async_session(request: Request):
+    if async_engine is None:
+        raise RuntimeError("Async database access is disabled (set DB_ASYNC=true)")
+    session = getattr(request.state, "async_db_session", None)
+    if session is not None:
+        yield session
+        return
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        request.state.async_db_session = session
+        try:
+            yield session
+        finally:
+            request.state.async_db_session = None
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+def service_reader(sync_service: type, async_service: type):
+    """Dependency for async handlers: an awaitable service for this deployment.
+
+    With ``DB_ASYNC`` it is ``async_service`` over an AsyncSession, so the
+    handler never takes a threadpool slot; otherwise the sync service runs
+    on the threadpool behind the same interface.
+    """
+    if async_engine is not None:
+
+        def get_service(session: AsyncSessionDep):
+            return async_service(session)
+
+    else:
+
+        def get_service(session: SessionDep):
+            return ThreadpoolService(sync_service(session))
+
+    return get_service
+
 
 def init_db():
+    # pg_trgm backs the trigram indexes declared on Patient
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     SQLModel.metadata.create_all(engine)
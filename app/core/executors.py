@@ -0,0 +1,84 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from fastapi import HTTPException, status
+from threading import Lock
+from typing import Any, Callable
+import asyncio
+
+
+class BoundedProcessPool:
+    """Process pool that rejects work once ``max_pending`` tasks are queued.
+
+    CPU-bound steps run in worker processes so they neither block the event
+    loop nor hold the GIL. When every worker is busy and the queue is full,
+    callers get a 503 with ``Retry-After`` instead of piling up.
+    """
+
+    def __init__(
+        self, name: str, max_workers: int, max_pending: int, retry_after: int
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self._rejected = 0
+        self._lock = Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # created lazily so importing the app does not start workers; spawned
+        # rather than forked because the API process already runs threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_pending:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"The {self.name} queue is full, try again later",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._in_flight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._release()
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # blocking variant for sync handlers; the GIL is released while waiting
+        self._acquire()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
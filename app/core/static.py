@@ -0,0 +1,87 @@
+from pathlib import PurePath
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+import os
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class BlobFileResponse(FileResponse):
+    """FileResponse that hands the file to the server when it can.
+
+    If the ASGI server advertises the ``http.response.zerocopysend``
+    extension, whole-file responses go out through sendfile(2). Otherwise
+    (uvicorn, ranges, HEAD) Starlette's own path is used, reading in 1 MiB
+    chunks instead of 64 KiB.
+    """
+
+    chunk_size = 1024 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            "http.response.zerocopysend" not in scope.get("extensions", {})
+            or scope["method"].upper() == "HEAD"
+            or "range" in Headers(scope=scope)
+            or self.stat_result is None
+        ):
+            return await super().__call__(scope, receive, send)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        with open(self.path, "rb") as file:
+            await send(
+                {
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "count": self.stat_result.st_size,
+                }
+            )
+        if self.background is not None:
+            await self.background()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for content-addressed blobs.
+
+    A file name always refers to the same bytes, so the name is a strong
+    ETag and responses may be cached forever. ``If-None-Match`` is answered
+    with 304 and byte ranges are served by ``FileResponse``. Only image
+    files are exposed; staging files and tensors stored alongside are not.
+    """
+
+    def __init__(self, *args, suffixes: tuple[str, ...] = (".png", ".webp"), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.suffixes = suffixes
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        parts = PurePath(path).parts
+        if (
+            not parts
+            or any(part.startswith(".") for part in parts)
+            or not path.endswith(self.suffixes)
+        ):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = BlobFileResponse(
+            full_path, status_code=status_code, stat_result=stat_result
+        )
+        response.headers["etag"] = f'"{os.path.basename(full_path)}"'
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
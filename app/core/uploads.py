@@ -0,0 +1,62 @@
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from typing import Callable
+
+# boundaries and part headers around the file in a multipart body
+MULTIPART_SLACK = 64 * 1024
+
+
+def max_body_size(max_bytes: int) -> Callable:
+    """Cap the request body of an endpoint served by ``BodyLimitRoute``."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.max_body_bytes = max_bytes
+        return endpoint
+
+    return decorator
+
+
+class BodyLimitRoute(APIRoute):
+    """APIRoute that enforces ``max_body_size`` on the raw request stream.
+
+    FastAPI parses (and Starlette spools) the whole multipart body before
+    the endpoint runs, so a cap checked while copying the ``UploadFile``
+    comes after an oversized body was already received. This route answers
+    413 from ``Content-Length`` before reading anything, and stops a
+    chunked body as soon as it goes over the cap. The cap allows
+    ``MULTIPART_SLACK`` for the multipart framing; the endpoint still
+    applies the exact limit to the file itself.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        max_bytes = getattr(self.endpoint, "max_body_bytes", None)
+        if max_bytes is None:
+            return handler
+        limit = max_bytes + MULTIPART_SLACK
+
+        def too_large() -> HTTPException:
+            return HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"The request body exceeds {max_bytes} bytes.",
+            )
+
+        async def limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                raise too_large()
+            receive = request.receive
+            received = 0
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise too_large()
+                return message
+
+            return await handler(Request(request.scope, limited_receive))
+
+        return limited_handler
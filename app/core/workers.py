@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from threading import Event, Thread
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PollingWorker(ABC):
+    """Background threads that drain a database-backed queue.
+
+    Subclasses implement ``process_once``, returning True when they handled
+    work (the thread loops again immediately) and False when the queue was
+    empty (the thread sleeps ``poll_seconds`` or until ``notify``).
+    """
+
+    name = "worker"
+
+    def __init__(self, workers: int, poll_seconds: float):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._wakeup = Event()
+        self._stopping = Event()
+        self._threads: list[Thread] = []
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = Thread(target=self._run, name=f"{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=self.poll_seconds + 1)
+        self._threads = []
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    @abstractmethod
+    def process_once(self) -> bool: ...
+
+    def on_idle(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if self.process_once():
+                    continue
+                self.on_idle()
+            except Exception:
+                logger.exception("%s failed while processing its queue", self.name)
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
@@ -1,5 +1,5 @@
-from ..core.database import SessionDep
-from .service import EvaluationService
+from ..core.database import SessionDep, service_reader
+from .service import AsyncEvaluationService, EvaluationService
 from typing import Annotated
 from fastapi import Depends
 
@@ -11,3 +11,8 @@ def get_evaluation_service(session: SessionDep) -> EvaluationService:
 evaluation_service_dependency = Annotated[
     EvaluationService, Depends(get_evaluation_service)
 ]
+# hot reads are async handlers; see service_reader
+async_evaluation_service_dependency = Annotated[
+    AsyncEvaluationService,
+    Depends(service_reader(EvaluationService, AsyncEvaluationService)),
+]
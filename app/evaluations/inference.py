@@ -0,0 +1,187 @@
+from ..core.cache import TTLCache
+from ..core.config import config
+from .models import Classification
+from .preprocessing import VERSION as PREPROCESSING_VERSION, load_tensor
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from threading import Lock
+import asyncio
+import hashlib
+import numpy as np
+import os
+import torch
+
+
+class CNNInferenceEngine:
+    """CPU inference for MRI-modality evaluations.
+
+    The TorchScript model is loaded once per API process and reads the
+    memory-mapped tensors written at upload time (see ``preprocessing``).
+    Concurrent ``predict`` calls are collected for up to ``max_wait``
+    seconds (or until ``max_batch`` images) and scored in a single forward pass on one
+    dedicated thread, with torch's intra-op threads capped so the worker
+    does not oversubscribe the CPU. When no model is configured the engine
+    is disabled and ``predict`` returns ``None``.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        classes: list[Classification],
+        threads: int,
+        max_batch: int,
+        max_wait: float,
+        max_pending: int,
+        retry_after: int,
+    ):
+        self.model_path = model_path
+        self.classes = classes
+        self.threads = threads
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._model = None
+        self._version: str | None = None
+        self._lock = Lock()
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cnn")
+        self._batches = 0
+        self._images = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_path) and os.path.exists(self.model_path)
+
+    def version(self) -> str:
+        """SHA-256 of the model and the preprocessing version; changes with
+        every published model or preprocessing spec change."""
+        with self._lock:
+            if self._version is None:
+                digest = hashlib.sha256()
+                with open(self.model_path, "rb") as f:
+                    while chunk := f.read(1024 * 1024):
+                        digest.update(chunk)
+                digest.update(PREPROCESSING_VERSION.encode())
+                self._version = digest.hexdigest()
+            return self._version
+
+    def load(self):
+        with self._lock:
+            if self._model is None and self.enabled:
+                torch.set_num_threads(self.threads)
+                model = torch.jit.load(self.model_path, map_location="cpu")
+                model.eval()
+                self._model = model
+            return self._model
+
+    def _predict_batch(self, paths: list[str]) -> list[tuple[Classification, float]]:
+        model = self.load()
+        # the tensors stored at upload time are memory-mapped, not decoded
+        batch = np.stack([load_tensor(path) for path in paths])
+        with torch.inference_mode():
+            output = torch.softmax(model(torch.from_numpy(batch)), dim=1)
+        probabilities, indices = output.max(dim=1)
+        return [
+            (self.classes[index], probability)
+            for index, probability in zip(indices.tolist(), probabilities.tolist())
+        ]
+
+    def predict_many(self, paths: list[str]) -> list[tuple[Classification, float]]:
+        # for batch rescoring outside the event loop
+        results = []
+        for start in range(0, len(paths), self.max_batch):
+            results.extend(self._predict_batch(paths[start : start + self.max_batch]))
+        return results
+
+    async def predict(self, path: str) -> tuple[Classification, float] | None:
+        if not self.enabled:
+            return None
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        if self._queue.qsize() >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="MRI inference is busy, retry later.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((path, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            paths = [path for path, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self._predict_batch, paths
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._batches += 1
+            self._images += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "loaded": self._model is not None,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batches": self._batches,
+            "images": self._images,
+            "avg_batch_size": self._images / self._batches if self._batches else 0.0,
+        }
+
+    def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+
+cnn_engine = CNNInferenceEngine(
+    model_path=config["CNN_MODEL_PATH"],
+    classes=[Classification(value) for value in config["CNN_CLASSES"]],
+    threads=config["CNN_THREADS"],
+    max_batch=config["CNN_MAX_BATCH"],
+    max_wait=config["CNN_BATCH_WAIT_MS"] / 1000,
+    max_pending=config["CNN_MAX_PENDING"],
+    retry_after=config["CNN_RETRY_AFTER_SECONDS"],
+)
+
+# in-memory first level of the InferenceCache table: (hash, version) -> result
+inference_cache = TTLCache(
+    maxsize=config["INFERENCE_CACHE_MAXSIZE"],
+    ttl=config["INFERENCE_CACHE_TTL_SECONDS"],
+)
+
+
+if __name__ == "__main__":
+    # rescores every MRI image after a new model is published:
+    #   python -m app.evaluations.inference
+    from ..core.database import engine
+    from .service import EvaluationService
+    from sqlmodel import Session
+
+    if not cnn_engine.enabled:
+        raise SystemExit("CNN_MODEL_PATH does not point to a model.")
+    with Session(engine) as session:
+        total = EvaluationService(session).rescore_mri_images()
+    print(f"{total} evaluations scored")
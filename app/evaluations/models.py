@@ -1,4 +1,5 @@
-from sqlmodel import Field, Relationship, Column, Enum as SQLEnum
+from sqlmodel import Field, Relationship, Column, Enum as SQLEnum, Index
+from sqlalchemy import JSON
 from typing import Optional
 from enum import Enum as PyEnum
 
@@ -46,11 +47,16 @@ class ClinicData(DraftModel, table=True):
 
 class MRIImage(DraftModel, table=True):
     url: str = Field(nullable=False, max_length=255)
+    # content-addressed name of the file in storage (see app/storage)
+    storage_key: str = Field(default=None, max_length=255, index=True)
+    # {"128": {"webp": key, "png": key}, "512": {...}, "full": {"webp": key}}
+    renditions: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     evaluation_id: int = Field(foreign_key="evaluation.id", unique=True)
     evaluation: Optional["Evaluation"] = Relationship(back_populates="mri_images")
 
 
 class Evaluation(DraftModel, table=True):
+    __table_args__ = (Index("ix_evaluation_created_at_id", "created_at", "id"),)
 
     patient_id: int = Field(foreign_key="patient.id")
 
@@ -85,3 +91,23 @@ class ClinicResults(DraftModel, table=True):
     evaluation_id: int = Field(default=None, foreign_key="evaluation.id", unique=True)
     evaluation: Optional[Evaluation] = Relationship(back_populates="clinic_result")
     description: Optional[str] = Field(default=None, nullable=True)
+
+
+class InferenceCache(DraftModel, table=True):
+    """Model result per image content and model version."""
+
+    __table_args__ = (
+        Index(
+            "ix_inferencecache_content_hash_model_version",
+            "content_hash",
+            "model_version",
+            unique=True,
+        ),
+    )
+
+    content_hash: str = Field(max_length=64)
+    model_version: str = Field(max_length=64)
+    classification: Classification = Field(
+        sa_column=Column(SQLEnum(Classification), nullable=False)
+    )
+    probability: Decimal = Field(max_digits=6, decimal_places=3)
@@ -0,0 +1,71 @@
+from ..core.config import config
+from PIL import Image
+import glob
+import hashlib
+import json
+import numpy as np
+import os
+import tempfile
+
+# preprocessing spec; any change here yields a new VERSION and the tensors
+# stored under the previous one stop being used
+SPEC = {
+    "size": config["CNN_INPUT_SIZE"],
+    "mode": "RGB",
+    "resample": "bilinear",
+    "scale": 1 / 255,
+    # normalization the network was trained with (ImageNet statistics)
+    "mean": [0.485, 0.456, 0.406],
+    "std": [0.229, 0.224, 0.225],
+    "layout": "CHW",
+    "dtype": "float32",
+}
+VERSION = hashlib.sha256(json.dumps(SPEC, sort_keys=True).encode()).hexdigest()[:12]
+
+MEAN = np.array(SPEC["mean"], dtype=np.float32).reshape(3, 1, 1)
+STD = np.array(SPEC["std"], dtype=np.float32).reshape(3, 1, 1)
+
+
+def preprocess_image(path: str) -> np.ndarray:
+    """Stored PNG -> normalized float32 CHW tensor, ready to stack."""
+    size = SPEC["size"]
+    with Image.open(path) as image:
+        image = image.convert(SPEC["mode"]).resize((size, size), Image.BILINEAR)
+        array = np.asarray(image, dtype=np.float32) * SPEC["scale"]
+    return (array.transpose(2, 0, 1) - MEAN) / STD
+
+
+def tensor_path(png_path: str) -> str:
+    return f"{os.path.splitext(png_path)[0]}.{VERSION}.npy"
+
+
+def save_tensor(png_path: str) -> str:
+    # runs in an image_pool process next to the freshly written PNG
+    path = tensor_path(png_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, preprocess_image(png_path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def load_tensor(png_path: str) -> np.ndarray:
+    """Model-ready tensor, memory-mapped when it is already stored.
+
+    When it is missing (an image older than the tensor store, or from
+    another spec version) it is computed from the PNG.
+    """
+    path = tensor_path(png_path)
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r")
+    return preprocess_image(png_path)
+
+
+def delete_tensors(png_path: str):
+    # removes the tensors of every spec version
+    for path in glob.glob(f"{glob.escape(os.path.splitext(png_path)[0])}.*.npy"):
+        os.remove(path)
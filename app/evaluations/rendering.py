@@ -0,0 +1,81 @@
+from ..core.config import config
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from threading import local
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+import os
+
+
+class ReportRenderer:
+    """Compiled template and stylesheet registry for PDF reports.
+
+    The Jinja environment (with an on-disk bytecode cache) is shared by all
+    threads. WeasyPrint's ``FontConfiguration`` and the parsed ``CSS`` are
+    kept per thread, since fontconfig/pango state is not safe to share
+    across concurrent renders; each thread still parses them only once.
+    With ``auto_reload`` the template and stylesheet are re-read when their
+    files change, for development.
+    """
+
+    def __init__(
+        self,
+        template_dir: str,
+        template_name: str,
+        stylesheet_name: str,
+        bytecode_cache_dir: str,
+        auto_reload: bool = False,
+    ):
+        self.template_dir = template_dir
+        self.template_name = template_name
+        self.stylesheet_path = os.path.join(template_dir, stylesheet_name)
+        self.auto_reload = auto_reload
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        self.environment = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+            auto_reload=auto_reload,
+        )
+        self._local = local()
+
+    def load(self) -> None:
+        # compile the template and parse the stylesheet ahead of the first render
+        self.environment.get_template(self.template_name)
+        self._stylesheet()
+
+    def version(self) -> str:
+        parts = []
+        for path in (
+            os.path.join(self.template_dir, self.template_name),
+            self.stylesheet_path,
+        ):
+            stat = os.stat(path)
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return "|".join(parts)
+
+    def _stylesheet(self) -> tuple[CSS, FontConfiguration]:
+        version = os.stat(self.stylesheet_path).st_mtime_ns if self.auto_reload else 0
+        if getattr(self._local, "version", None) != version:
+            font_config = FontConfiguration()
+            self._local.css = CSS(
+                filename=self.stylesheet_path, font_config=font_config
+            )
+            self._local.font_config = font_config
+            self._local.version = version
+        return self._local.css, self._local.font_config
+
+    def render_pdf(self, **context) -> bytes:
+        template = self.environment.get_template(self.template_name)
+        html_content = template.render(**context)
+        css, font_config = self._stylesheet()
+        return HTML(string=html_content, base_url=self.template_dir).write_pdf(
+            stylesheets=[css], font_config=font_config
+        )
+
+
+report_renderer = ReportRenderer(
+    template_dir="app/evaluations/template",
+    template_name="generate_evaluation.html",
+    stylesheet_name="generate_evaluation.css",
+    bytecode_cache_dir=config["JINJA_BYTECODE_CACHE_DIR"],
+    auto_reload=config["ENVIRONMENT"] == "development",
+)
@@ -1,20 +1,33 @@
 from fastapi import Request, Query
+from .models import Modality
 from .schemas import ClinicDataModel, EvaluationModel, ClinicResultsModel
 from ..auth.router import (
+    async_user_service_dependency,
     current_user_dependency,
     user_service_dependency,
     get_current_user_info,
+    get_current_user_info_async,
 )
 from ..patients.router import patient_service_dependency
 from .validations import (
+    get_full_evaluation_of_my_patient,
     is_my_patient,
     is_evaluation_of_my_patient,
 )
 from fastapi import APIRouter, UploadFile, HTTPException
-from .dependencies import evaluation_service_dependency
+from .dependencies import (
+    async_evaluation_service_dependency,
+    evaluation_service_dependency,
+)
+from ..core.conditional import ConditionalDep
+from ..core.config import config
+from ..core.uploads import BodyLimitRoute, max_body_size
+from .scoring import rf_engine
 
-evaluations_router = APIRouter(prefix="/evaluations", tags=["Evaluations"])
-from fastapi import BackgroundTasks, Response, Depends
+evaluations_router = APIRouter(
+    prefix="/evaluations", tags=["Evaluations"], route_class=BodyLimitRoute
+)
+from fastapi import Response, Depends
 
 
 # Evaluation endpoints
@@ -32,13 +45,24 @@ def create_evaluation_of_patient(
     return service.create_evaluation_of_patient(patient_id, evaluation_data)
 
 
+@evaluations_router.post("/bulk")
+def create_evaluations_bulk(
+    token_data: current_user_dependency,
+    items: list[dict],
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(token_data, user_service, request)
+    return service.create_evaluations_bulk(user_id, items)
+
+
 @evaluations_router.put("/{evaluation_id}")
 def update_evaluation(
     evaluation_id: int,
     evaluation_data: EvaluationModel,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -46,7 +70,6 @@ def update_evaluation(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -54,18 +77,25 @@ def update_evaluation(
 
 
 @evaluations_router.get("")
-def get_evaluations(
+async def get_evaluations(
     tokendata: current_user_dependency,
-    service: evaluation_service_dependency,
-    user_service: user_service_dependency,
+    service: async_evaluation_service_dependency,
+    user_service: async_user_service_dependency,
     request: Request,
+    response: Response,
+    conditional: ConditionalDep,
     limit: int = Query(10, ge=1, le=100),
     skip: int = Query(0, ge=0),
     full_name: str = Query(None, min_length=1, max_length=100),
     dni: str = Query(None, min_length=1, max_length=20),
-    modality: str = Query(None, min_length=1, max_length=50),
+    modality: Modality = Query(None),
+    after: str = Query(
+        None,
+        max_length=200,
+        description="Pagination cursor; empty for the first page",
+    ),
 ):
-    user_id = get_current_user_info(tokendata, user_service, request)
+    user_id = await get_current_user_info_async(tokendata, user_service, request)
     filters = {}
     if full_name:
         filters["full_name"] = full_name
@@ -74,7 +104,23 @@ def get_evaluations(
     if modality:
         filters["modality"] = modality
 
-    return service.get_evaluations(user_id, filters, skip=skip, limit=limit)
+    if after is not None:
+        try:
+            evaluations, next_cursor = await service.get_evaluations_after(
+                user_id, filters, after=after, limit=limit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": evaluations, "next_cursor": next_cursor}
+
+    last_updated, total = await service.get_evaluations_fingerprint(user_id, filters)
+    page = (skip, limit, sorted(filters.items()))
+    conditional.check_collection(last_updated, "evaluations", user_id, total, page)
+    evaluations, total = await service.get_evaluations(
+        user_id, filters, skip=skip, limit=limit, total=total
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return evaluations
 
 
 @evaluations_router.get("/patient/dni/{dni}")
@@ -99,14 +145,44 @@ def get_evaluation(
     tokendata: current_user_dependency,
     evaluation_id: int,
     service: evaluation_service_dependency,
-    patient_service: patient_service_dependency,
     user_service: user_service_dependency,
     request: Request,
+    conditional: ConditionalDep,
 ):
-    is_evaluation_of_my_patient(
-        tokendata, evaluation_id, service, patient_service, user_service, request
+    evaluation = is_evaluation_of_my_patient(
+        tokendata, evaluation_id, service, user_service, request
+    )
+    conditional.check(evaluation.updated_at, "evaluation", evaluation.id)
+    return evaluation
+
+
+@evaluations_router.get("/{evaluation_id}/full")
+def get_evaluation_full(
+    tokendata: current_user_dependency,
+    evaluation_id: int,
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+    conditional: ConditionalDep,
+):
+    evaluation = get_full_evaluation_of_my_patient(
+        tokendata, evaluation_id, service, user_service, request
     )
-    return service.get_evaluation(evaluation_id)
+    parts = [
+        evaluation,
+        evaluation.patient,
+        evaluation.clinic_data,
+        evaluation.mri_images,
+        evaluation.clinic_result,
+    ]
+    parts = [part for part in parts if part is not None]
+    # a deleted part does not move max(updated_at): the ETag carries the ids
+    conditional.check_collection(
+        max(part.updated_at for part in parts),
+        "evaluation_full",
+        [(type(part).__name__, part.id) for part in parts],
+    )
+    return service.evaluation_full_to_dict(evaluation)
 
 
 @evaluations_router.delete("/{evaluation_id}")
@@ -114,7 +190,6 @@ def delete_evaluation(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -122,7 +197,6 @@ def delete_evaluation(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -130,13 +204,37 @@ def delete_evaluation(
 
 
 # Clinic Data endpoints
+@evaluations_router.post("/clinic_data/score")
+def rescore_clinic_data(
+    tokendata: current_user_dependency,
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    if not rf_engine.enabled:
+        raise HTTPException(status_code=503, detail="RF model is not configured.")
+    user_id = get_current_user_info(tokendata, user_service, request)
+    return {"scored": service.rescore_clinic_data(user_id)}
+
+
+@evaluations_router.post("/clinic_data/bulk")
+def create_clinic_data_bulk(
+    token_data: current_user_dependency,
+    items: list[dict],
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(token_data, user_service, request)
+    return service.create_clinic_data_bulk(user_id, items)
+
+
 @evaluations_router.post("/{evaluation_id}/clinic_data")
 def create_clinic_data(
     evaluation_id: int,
     clinic_data: ClinicDataModel,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -144,7 +242,6 @@ def create_clinic_data(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -156,19 +253,21 @@ def get_clinic_data_by_evaluation(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
+    conditional: ConditionalDep,
 ):
     is_evaluation_of_my_patient(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
-    return service.get_clinic_data_by_evaluation(evaluation_id)
+    clinic_data = service.get_clinic_data_by_evaluation(evaluation_id)
+    if clinic_data:
+        conditional.check(clinic_data.updated_at, "clinic_data", clinic_data.id)
+    return clinic_data
 
 
 @evaluations_router.put("/{evaluation_id}/clinic_data")
@@ -177,7 +276,6 @@ def update_clinic_data(
     clinic_data: ClinicDataModel,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -185,7 +283,6 @@ def update_clinic_data(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -197,7 +294,6 @@ def delete_clinic_data(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -205,7 +301,6 @@ def delete_clinic_data(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -214,12 +309,12 @@ def delete_clinic_data(
 
 # MRI Image endpoints
 @evaluations_router.post("/{evaluation_id}/mri_image")
+@max_body_size(config["MRI_MAX_UPLOAD_BYTES"])
 async def create_mri_image(
     evaluation_id: int,
     imagefile: UploadFile,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -227,11 +322,11 @@ async def create_mri_image(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
-    return await service.create_mri_image(evaluation_id, imagefile)
+    mri_image = await service.create_mri_image(evaluation_id, imagefile)
+    return service.mri_image_to_dict(mri_image)
 
 
 @evaluations_router.get("/{evaluation_id}/mri_image")
@@ -239,19 +334,26 @@ def get_mri_image_by_evaluation(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
+    size: str = Query(
+        "full",
+        pattern=r"^(full|\d{1,5})$",
+        description="Longest side of the rendition in pixels, or 'full'",
+    ),
+    format: str = Query("png", pattern="^(png|webp)$"),
 ):
     is_evaluation_of_my_patient(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
-    return service.get_mri_image_by_evaluation(evaluation_id)
+    mri_image = service.get_mri_image_by_evaluation(evaluation_id)
+    if not mri_image:
+        return None
+    return service.mri_image_to_dict(mri_image, size, format)
 
 
 @evaluations_router.put("/{evaluation_id}/mri_image")
@@ -260,7 +362,6 @@ async def update_mri_image(
     imagefile: UploadFile,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -268,11 +369,11 @@ async def update_mri_image(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
-    return await service.update_mri_image(evaluation_id, imagefile)
+    mri_image = await service.update_mri_image(evaluation_id, imagefile)
+    return service.mri_image_to_dict(mri_image)
 
 
 @evaluations_router.delete("/{evaluation_id}/mri_image")
@@ -280,7 +381,6 @@ def delete_mri_image(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -288,7 +388,6 @@ def delete_mri_image(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -296,13 +395,24 @@ def delete_mri_image(
 
 
 # Clinic Results endpoints
+@evaluations_router.post("/clinic_results/bulk")
+def create_clinic_results_bulk(
+    token_data: current_user_dependency,
+    items: list[dict],
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(token_data, user_service, request)
+    return service.create_clinic_results_bulk(user_id, items)
+
+
 @evaluations_router.post("/{evaluation_id}/clinic_results")
 def create_clinic_results(
     evaluation_id: int,
     clinic_results: ClinicResultsModel,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -310,7 +420,6 @@ def create_clinic_results(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -322,7 +431,6 @@ def get_clinic_results_by_evaluation(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -330,7 +438,6 @@ def get_clinic_results_by_evaluation(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -343,7 +450,6 @@ def update_clinic_results(
     clinic_results: ClinicResultsModel,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -351,7 +457,6 @@ def update_clinic_results(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -363,7 +468,6 @@ def delete_clinic_results(
     evaluation_id: int,
     service: evaluation_service_dependency,
     user_service: user_service_dependency,
-    patient_service: patient_service_dependency,
     current_user_dependency: current_user_dependency,
     request: Request,
 ):
@@ -371,7 +475,6 @@ def delete_clinic_results(
         current_user_dependency,
         evaluation_id,
         service,
-        patient_service,
         user_service,
         request,
     )
@@ -386,7 +489,6 @@ def send_patient_evaluations_pdf(
     request: Request,
     service: evaluation_service_dependency,
     patient_service: patient_service_dependency,
-    background_tasks: BackgroundTasks,
     evaluation_id: int = Query(
         None, description="ID de evaluación específica (opcional)"
     ),
@@ -427,9 +529,8 @@ def send_patient_evaluations_pdf(
             raise HTTPException(
                 status_code=400, detail="Debe proporcionar un correo electrónico"
             )
-        background_tasks.add_task(
-            service.send_evaluations_pdf_by_email, email, pdf_bytes, patient_id
-        )
+        # queued in the outbox; delivery happens in the outbox worker
+        service.send_evaluations_pdf_by_email(email, pdf_bytes, patient_id)
         return {"message": f"El PDF se enviará a {email}"}
     else:
         return Response(
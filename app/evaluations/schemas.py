@@ -1,5 +1,6 @@
 from .models import Modality, Classification
 from ..patients.schemas import PatientModel
+from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel
 from typing import Optional
@@ -32,3 +33,18 @@ class ClinicResultsModel(BaseModel):
 
 class EvaluationWithPatientRead(EvaluationModel):
     patient: Optional[PatientModel]
+
+
+# bulk items: the single-item schemas plus the id they would get from the path
+class EvaluationBulkItem(EvaluationModel):
+    patient_id: int
+    # historical imports keep their original date
+    created_at: Optional[datetime] = None
+
+
+class ClinicDataBulkItem(ClinicDataModel):
+    evaluation_id: int
+
+
+class ClinicResultsBulkItem(ClinicResultsModel):
+    evaluation_id: int
@@ -0,0 +1,92 @@
+from ..core.config import config
+from .models import Classification
+from decimal import Decimal
+from threading import Lock
+import joblib
+import numpy as np
+import os
+
+# ClinicData columns in the order the model was trained on
+FEATURES = ("memory", "orient", "judgment", "commun", "homehobb")
+
+
+def feature_matrix(rows) -> np.ndarray:
+    """Rows with the FEATURES attributes -> float64 matrix.
+
+    Missing values become NaN, which the random forest accepts.
+    """
+    return np.array(
+        [
+            [
+                np.nan if getattr(row, field) is None else float(getattr(row, field))
+                for field in FEATURES
+            ]
+            for row in rows
+        ],
+        dtype=np.float64,
+    ).reshape(-1, len(FEATURES))
+
+
+class RFScoringEngine:
+    """Random-forest scoring for clinic-data (RF modality) evaluations.
+
+    The joblib'd model is loaded once per process and reused by every call.
+    ``score_matrix`` takes a whole feature matrix so a batch of evaluations
+    is scored with a single ``predict_proba``. When no model is configured
+    the engine is disabled and scoring returns ``None``.
+    """
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self._model = None
+        self._classes: list[Classification] = []
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_path) and os.path.exists(self.model_path)
+
+    def load(self):
+        with self._lock:
+            if self._model is None and self.enabled:
+                model = joblib.load(self.model_path)
+                self._classes = [Classification(str(c)) for c in model.classes_]
+                self._model = model
+            return self._model
+
+    def score_matrix(
+        self, matrix: np.ndarray
+    ) -> list[tuple[Classification, Decimal]] | None:
+        model = self.load()
+        if model is None:
+            return None
+        if not len(matrix):
+            return []
+        probabilities = model.predict_proba(matrix)
+        indices = probabilities.argmax(axis=1)
+        maxima = probabilities[np.arange(len(indices)), indices]
+        return [
+            (self._classes[index], Decimal(f"{probability:.3f}"))
+            for index, probability in zip(indices.tolist(), maxima.tolist())
+        ]
+
+    def score(self, clinic_data) -> tuple[Classification, Decimal] | None:
+        results = self.score_matrix(feature_matrix([clinic_data]))
+        return results[0] if results else None
+
+
+rf_engine = RFScoringEngine(model_path=config["RF_MODEL_PATH"])
+
+
+if __name__ == "__main__":
+    # rescores the whole database after the model is updated:
+    #   python -m app.evaluations.scoring
+    from ..core.database import engine
+    from .service import EvaluationService
+    from sqlmodel import Session
+
+    if not rf_engine.enabled:
+        raise SystemExit("RF_MODEL_PATH does not point to a model.")
+    with Session(engine) as session:
+        total = EvaluationService(session).rescore_clinic_data()
+    print(f"{total} evaluations scored")
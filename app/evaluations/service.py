@@ -1,31 +1,154 @@
+from ..core.cache import DiskLRUCache
 from ..core.config import config
-from ..utils import CRUDDraft
-from .models import ClinicData, ClinicResults, Evaluation, MRIImage
-from ..patients.models import Patient
-from .schemas import ClinicDataModel, EvaluationModel, ClinicResultsModel
-from .utils import convertir_a_png, guardar_imagen_png, eliminar_imagen
+from ..outbox.service import OutboxService
+from ..utils import (
+    AsyncService,
+    CRUDDraft,
+    contains_pattern,
+    decode_cursor,
+    encode_cursor,
+)
+from .models import (
+    Classification,
+    ClinicData,
+    ClinicResults,
+    Evaluation,
+    InferenceCache,
+    MRIImage,
+    Modality,
+)
+from .inference import cnn_engine, inference_cache
+from .preprocessing import delete_tensors, save_tensor, tensor_path
+from .rendering import report_renderer
+from .scoring import FEATURES, feature_matrix, rf_engine
+from ..patients.models import Patient, patient_full_name
+from ..storage.drivers import storage
+from ..storage.service import StorageService
+from .schemas import (
+    ClinicDataBulkItem,
+    ClinicDataModel,
+    ClinicResultsBulkItem,
+    ClinicResultsModel,
+    EvaluationBulkItem,
+    EvaluationModel,
+)
+from .utils import image_pool, process_image_png, receive_image
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
-import smtplib
+from sqlalchemy import Date, func, insert, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 from email.message import EmailMessage
 from io import BytesIO
-from weasyprint import HTML
-from jinja2 import Template
-from datetime import datetime
+from datetime import datetime, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email import encoders
 from datetime import date
+from decimal import Decimal
+import hashlib
+import os
+
+
+def _evaluation_conditions(user_id: int, filters: dict) -> list:
+    conditions = [Patient.user_id == user_id]
+    if filters.get("full_name"):
+        conditions.append(
+            patient_full_name().ilike(
+                contains_pattern(filters["full_name"]), escape="\\"
+            )
+        )
+    if filters.get("dni"):
+        conditions.append(
+            Patient.dni.ilike(contains_pattern(filters["dni"]), escape="\\")
+        )
+    if filters.get("modality"):
+        conditions.append(Evaluation.modality == filters["modality"])
+    return conditions
+
+
+def _evaluation_rows_to_dicts(rows) -> list[dict]:
+    response = []
+    for evaluation, patient in rows:
+        evaluation_data = evaluation.model_dump(by_alias=True, exclude={"patient_id"})
+        evaluation_data["patient"] = patient.model_dump(
+            by_alias=True, exclude={"user_id"}
+        )
+        response.append(evaluation_data)
+    return response
+
+
+# the list reads build their statements here so EvaluationService and
+# AsyncEvaluationService run exactly the same SQL
+
+
+def _evaluations_fingerprint_query(user_id: int, filters: dict):
+    # every row embeds its patient, so the patient's updated_at counts too
+    return (
+        select(
+            func.max(func.greatest(Evaluation.updated_at, Patient.updated_at)),
+            func.count(Evaluation.id),
+        )
+        .join(Patient)
+        .where(*_evaluation_conditions(user_id, filters))
+    )
+
+
+def _evaluations_count_query(user_id: int, filters: dict):
+    return (
+        select(func.count(Evaluation.id))
+        .join(Patient)
+        .where(*_evaluation_conditions(user_id, filters))
+    )
+
+
+def _evaluations_page_query(user_id: int, filters: dict, skip: int, limit: int):
+    return (
+        select(Evaluation, Patient)
+        .join(Patient)
+        .where(*_evaluation_conditions(user_id, filters))
+        .order_by(Evaluation.created_at.desc(), Evaluation.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def _evaluations_after_query(
+    user_id: int, filters: dict, after: str | None, limit: int
+):
+    conditions = _evaluation_conditions(user_id, filters)
+    if after:
+        created_at, evaluation_id = decode_cursor(after)
+        conditions.append(
+            tuple_(Evaluation.created_at, Evaluation.id)
+            < tuple_(created_at, evaluation_id)
+        )
+    return (
+        select(Evaluation, Patient)
+        .join(Patient)
+        .where(*conditions)
+        .order_by(Evaluation.created_at.desc(), Evaluation.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def _evaluations_after_page(rows, limit: int) -> tuple[list[dict], str | None]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_evaluation = rows[-1][0]
+        next_cursor = encode_cursor(last_evaluation.created_at, last_evaluation.id)
+    return _evaluation_rows_to_dicts(rows), next_cursor
 
 
 class EvaluationService:
     def __init__(self, session: Session):
         self.session = session
         self.crud = CRUDDraft(self.session)
-        self.bucket_local = config["S3_BUCKET_NAME"]
-        self.bucket_path = f"app/{self.bucket_local}"
+        self.storage_service = StorageService(self.session)
 
     # evaluation methods
     def create_evaluation_of_patient(
@@ -49,10 +172,9 @@ class EvaluationService:
                     status_code=400,
                     detail="A patient can only have one evaluation per day with the same modality.",
                 )
+        # model_classification is computed by the server; the client's is ignored
         if evaluation_data.manual_classification:
             evaluation.manual_classification = evaluation_data.manual_classification
-        if evaluation_data.model_classification:
-            evaluation.model_classification = evaluation_data.model_classification
         return self.crud.create(evaluation, Evaluation)
 
     def update_evaluation(
@@ -72,50 +194,30 @@ class EvaluationService:
 
         return self.crud.update(evaluation_id, Evaluation, evaluation)
 
+    def get_evaluations_fingerprint(
+        self, user_id: int, filters: dict
+    ) -> tuple[datetime | None, int]:
+        query = _evaluations_fingerprint_query(user_id, filters)
+        return tuple(self.session.exec(query).one())
+
     def get_evaluations(
-        self, user_id: int, filters: dict, skip: int = 0, limit: int = 10
-    ) -> list[Evaluation]:
-        select_query = (
-            select(Evaluation)
-            .join(Patient)
-            .where(Patient.user_id == user_id)
-            .options(selectinload(Evaluation.patient))
-        )
-        evaluations: list[Evaluation] = self.session.exec(select_query).all()
+        self,
+        user_id: int,
+        filters: dict,
+        skip: int = 0,
+        limit: int = 10,
+        total: int | None = None,
+    ) -> tuple[list[dict], int]:
+        if total is None:
+            total = self.session.exec(_evaluations_count_query(user_id, filters)).one()
+        query = _evaluations_page_query(user_id, filters, skip, limit)
+        return _evaluation_rows_to_dicts(self.session.exec(query).all()), total
 
-        if not evaluations:
-            return []
-        if filters.get("patient_name"):
-            evaluations = [
-                evaluation
-                for evaluation in evaluations
-                if filters["patient_name"].lower()
-                in f"{evaluation.patient.name} {evaluation.patient.last_name}".lower()
-            ]
-        if filters.get("dni"):
-            evaluations = [
-                evaluation
-                for evaluation in evaluations
-                if filters["dni"].lower() in evaluation.patient.dni.lower()
-            ]
-        if filters.get("modality"):
-            evaluations = [
-                evaluation
-                for evaluation in evaluations
-                if filters["modality"].lower() in evaluation.modality.value.lower()
-            ]
-        evaluations = evaluations[skip : skip + limit]
-        response = []
-        for evaluation in evaluations:
-            evaluation_data = evaluation.model_dump(
-                by_alias=True, exclude={"patient_id"}
-            )
-            evaluation_data["patient"] = evaluation.patient.model_dump(
-                by_alias=True, exclude={"user_id"}
-            )
-            response.append(evaluation_data)
-        response.sort(key=lambda x: x["created_at"], reverse=True)
-        return response
+    def get_evaluations_after(
+        self, user_id: int, filters: dict, after: str | None, limit: int = 10
+    ) -> tuple[list[dict], str | None]:
+        query = _evaluations_after_query(user_id, filters, after, limit)
+        return _evaluations_after_page(self.session.exec(query).all(), limit)
 
     def get_evaluations_by_patient(self, patient_id: int) -> list[Evaluation]:
         return self.crud.get_all_by_foreign_key(patient_id, Evaluation, "patient_id")
@@ -134,18 +236,88 @@ class EvaluationService:
     def get_evaluation(self, evaluation_id: int) -> Evaluation | None:
         return self.crud.get(evaluation_id, Evaluation)
 
-    def delete_evaluation(self, evaluation_id: int) -> Evaluation:
-        return self.crud.delete(evaluation_id, Evaluation)
+    def get_evaluation_with_owner(
+        self, evaluation_id: int
+    ) -> tuple[Evaluation, int] | None:
+        select_query = (
+            select(Evaluation, Patient.user_id)
+            .join(Patient)
+            .where(Evaluation.id == evaluation_id)
+        )
+        return self.session.exec(select_query).first()
+
+    def get_evaluation_full(self, evaluation_id: int) -> Evaluation | None:
+        # evaluation, patient and sub-resources (all one-to-one) in one query
+        select_query = (
+            select(Evaluation)
+            .join(Patient)
+            .where(Evaluation.id == evaluation_id)
+            .options(
+                contains_eager(Evaluation.patient),
+                joinedload(Evaluation.clinic_data),
+                joinedload(Evaluation.mri_images),
+                joinedload(Evaluation.clinic_result),
+            )
+        )
+        return self.session.exec(select_query).first()
+
+    def evaluation_full_to_dict(self, evaluation: Evaluation) -> dict:
+        data = evaluation.model_dump()
+        data["patient"] = evaluation.patient.model_dump(
+            by_alias=True, exclude={"user_id"}
+        )
+        data["clinic_data"] = evaluation.clinic_data
+        data["mri_image"] = (
+            self.mri_image_to_dict(evaluation.mri_images)
+            if evaluation.mri_images
+            else None
+        )
+        data["clinic_results"] = evaluation.clinic_result
+        return data
+
+    def delete_evaluation(self, evaluation_id: int) -> Evaluation | None:
+        evaluation = self.crud.get(evaluation_id, Evaluation)
+        if not evaluation:
+            return None
+        released = self.delete_evaluations(Evaluation.id == evaluation_id)
+        self.session.commit()
+        self.purge_images(released)
+        return evaluation
+
+    def delete_evaluations(self, *conditions) -> list[str]:
+        """Delete the matching evaluations in the caller's transaction.
+
+        Their MRI blobs are released here; returns the keys that lost their
+        last reference, which the caller passes to ``purge_images`` once the
+        transaction has committed.
+        """
+        evaluations = self.session.exec(
+            select(Evaluation)
+            .where(*conditions)
+            .options(selectinload(Evaluation.mri_images))
+        ).all()
+        released = []
+        for evaluation in evaluations:
+            if evaluation.mri_images:
+                released.extend(
+                    key
+                    for key in self._image_keys(evaluation.mri_images)
+                    if self.storage_service.release(key)
+                )
+            self.session.delete(evaluation)
+        return released
 
     # clinic data methods
     def create_clinic_data(
         self, evaluation_id, clinic_data: ClinicDataModel
     ) -> ClinicData:
         clinic = ClinicData(
-            **clinic_data.model_dump(),
+            **clinic_data.model_dump(include=set(FEATURES)),
             evaluation_id=evaluation_id,
         )
-        return self.crud.create(clinic, ClinicData)
+        clinic = self.crud.create(clinic, ClinicData)
+        self._score_clinic_data(clinic)
+        return clinic
 
     def get_clinic_data_by_evaluation(self, evaluation_id: int) -> ClinicData:
         return self.crud.get_by_foreign_key(evaluation_id, ClinicData, "evaluation_id")
@@ -153,26 +325,71 @@ class EvaluationService:
     def update_clinic_data(
         self, evaluation_id: int, clinic_data: ClinicDataModel
     ) -> ClinicData:
-        clinic = ClinicData(
-            **clinic_data.model_dump(),
-            evaluation_id=evaluation_id,
-        )
         clinic: ClinicData | None = self.crud.get_by_foreign_key(
             evaluation_id, ClinicData, "evaluation_id"
         )
         if not clinic:
-            clinic = self.create_clinic_data(evaluation_id, clinic_data)
-            return clinic
+            return self.create_clinic_data(evaluation_id, clinic_data)
 
-        clinic_data.adl = clinic_data.adl or clinic.adl
-        clinic_data.iadl = clinic_data.iadl or clinic.iadl
-        clinic_data.berg = clinic_data.berg or clinic.berg
-        clinic_data.potassium = clinic_data.potassium or clinic.potassium
-        clinic_data.vitamin_d = clinic_data.vitamin_d or clinic.vitamin_d
-        clinic_data.vit_b12 = clinic_data.vit_b12 or clinic.vit_b12
-        clinic_data.stress = clinic_data.stress or clinic.stress
+        # fields left out keep their previous value
+        for field, value in clinic_data.model_dump(
+            include=set(FEATURES), exclude_none=True
+        ).items():
+            setattr(clinic, field, value)
+        self.session.add(clinic)
+        self.session.commit()
+        self.session.refresh(clinic)
+        self._score_clinic_data(clinic)
+        return clinic
 
-        return self.crud.update(clinic.id, ClinicData, clinic_data)
+    def _score_clinic_data(self, clinic: ClinicData):
+        evaluation = self.session.get(Evaluation, clinic.evaluation_id)
+        # in a CNN evaluation the classification comes from the network, not the RF
+        if evaluation is None or evaluation.modality != Modality.RF:
+            return
+        result = rf_engine.score(clinic)
+        if result is None:
+            return
+        evaluation.model_classification, evaluation.model_probability = result
+        self.session.add(evaluation)
+        self.session.commit()
+
+    def rescore_clinic_data(self, user_id: int | None = None) -> int:
+        """Score the RF evaluations again with the loaded model.
+
+        Loads every ClinicData row in one query, scores them with a single
+        ``predict_proba`` and saves the results with a batched UPDATE.
+        Without ``user_id`` it covers the whole database.
+        """
+        query = (
+            select(
+                ClinicData.evaluation_id,
+                *(getattr(ClinicData, field) for field in FEATURES),
+            )
+            .join(Evaluation, Evaluation.id == ClinicData.evaluation_id)
+            .where(Evaluation.modality == Modality.RF)
+        )
+        if user_id is not None:
+            query = query.join(Patient, Patient.id == Evaluation.patient_id).where(
+                Patient.user_id == user_id
+            )
+        rows = self.session.exec(query).all()
+        results = rf_engine.score_matrix(feature_matrix(rows))
+        if not results:
+            return 0
+        self.session.execute(
+            update(Evaluation),
+            [
+                {
+                    "id": row.evaluation_id,
+                    "model_classification": classification,
+                    "model_probability": probability,
+                }
+                for row, (classification, probability) in zip(rows, results)
+            ],
+        )
+        self.session.commit()
+        return len(results)
 
     def delete_clinic_data(self, evaluation_id: int) -> ClinicData:
 
@@ -184,51 +401,265 @@ class EvaluationService:
     async def create_mri_image(
         self, evaluation_id: int, imagefile: UploadFile
     ) -> MRIImage:
-        contenido = await imagefile.read()
-        imagen = convertir_a_png(contenido)
         # is evaluatio id exists trow error
         if self.crud.get_by_foreign_key(evaluation_id, MRIImage, "evaluation_id"):
             raise HTTPException(
                 status_code=400,
                 detail="An MRI image for this evaluation already exists.",
             )
-
-        if config["ENVIRONMENT"] == "development":
-            nombre_archivo = guardar_imagen_png(imagen, self.bucket_path)
-            url = f"https://intellicog-api-production.up.railway.app/api/v1/{self.bucket_local}/{nombre_archivo}"
-            mri_image = MRIImage(evaluation_id=evaluation_id, url=url)
-            return self.crud.create(mri_image, MRIImage)
+        return await self._save_image(MRIImage(evaluation_id=evaluation_id), imagefile)
 
     def get_mri_image_by_evaluation(self, evaluation_id: int) -> MRIImage:
         return self.crud.get_by_foreign_key(evaluation_id, MRIImage, "evaluation_id")
 
+    def mri_image_to_dict(
+        self, mri_image: MRIImage, size: str = "full", image_format: str = "png"
+    ) -> dict:
+        """MRIImage with the url of the requested rendition and all the others.
+
+        If that rendition does not exist (a small image, or one stored before
+        renditions) the next larger one is used, and the original PNG last.
+        """
+        renditions = {
+            name: {fmt: storage.url(key) for fmt, key in formats.items()}
+            for name, formats in (mri_image.renditions or {}).items()
+        }
+        candidates = []
+        if size != "full":
+            candidates = sorted(
+                (n for n in renditions if n != "full" and int(n) >= int(size)), key=int
+            )
+        url = mri_image.url
+        for name in candidates + ["full"]:
+            if image_format in renditions.get(name, {}):
+                url = renditions[name][image_format]
+                break
+        data = mri_image.model_dump(exclude={"renditions"})
+        data["url"] = url
+        data["renditions"] = renditions
+        return data
+
     async def update_mri_image(
         self, evaluation_id: int, imagefile: UploadFile
     ) -> MRIImage:
-        # borrar imagen anterior
         mri_image: MRIImage | None = self.crud.get_by_foreign_key(
             evaluation_id, MRIImage, "evaluation_id"
         )
-        if mri_image:
-            eliminar_imagen(mri_image.url, self.bucket_path)
-        # guardar nueva imagen
-        contenido = await imagefile.read()
-        imagen = convertir_a_png(contenido)
-        if config["ENVIRONMENT"] == "development":
-            nombre_archivo = guardar_imagen_png(imagen, self.bucket_path)
-            url = f"http://localhost:8000/{self.bucket_local}/{nombre_archivo}"
-            mri_image = MRIImage(evaluation_id=evaluation_id, image_url=url)
-        return self.crud.update_by_foreign_key(
-            evaluation_id, MRIImage, mri_image, "evaluation_id"
+        return await self._save_image(
+            mri_image or MRIImage(evaluation_id=evaluation_id), imagefile
         )
 
+    async def _save_image(self, mri_image: MRIImage, imagefile: UploadFile) -> MRIImage:
+        content_hash, files = await self._process_image(imagefile)
+        # content-addressed names: the same image is stored only once
+        key = f"{content_hash}.png"
+        staging = {key: files.pop("main")}
+        renditions = {}
+        for name, formats in files.items():
+            renditions[name] = {}
+            for image_format, path in formats.items():
+                staging[f"{content_hash}_{name}.{image_format}"] = path
+                renditions[name][image_format] = f"{content_hash}_{name}.{image_format}"
+        mri_image = await run_in_threadpool(
+            self._store_image, mri_image, key, staging, renditions
+        )
+
+        if cnn_engine.enabled:
+            evaluation = await run_in_threadpool(
+                self.crud.get, mri_image.evaluation_id, Evaluation
+            )
+            # an RF evaluation keeps the random-forest classification
+            if evaluation.modality == Modality.CNN:
+                path = await run_in_threadpool(storage.local_path, key)
+                if not os.path.exists(tensor_path(path)):
+                    # model-ready tensor next to the PNG, so it is not decoded again
+                    await image_pool.run(save_tensor, path)
+                await self._classify_image(evaluation, path, content_hash)
+        return mri_image
+
+    def _store_image(
+        self, mri_image: MRIImage, key: str, staging: dict[str, str], renditions
+    ) -> MRIImage:
+        # blocking (driver uploads and transaction): runs in the threadpool
+        previous_keys = self._image_keys(mri_image)
+        uploaded, released = [], []
+        try:
+            for blob_key, path in staging.items():
+                if self.storage_service.acquire(path, blob_key):
+                    uploaded.append(blob_key)
+            mri_image.storage_key = key
+            mri_image.renditions = renditions
+            mri_image.url = storage.url(key)
+            self.session.add(mri_image)
+            for blob_key in previous_keys:
+                if self.storage_service.release(blob_key):
+                    released.append(blob_key)
+            self.session.commit()
+        except BaseException:
+            self.session.rollback()
+            # what this transaction uploaded no longer has a row referencing it
+            self.purge_images(uploaded)
+            for path in staging.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        self.purge_images(released)
+        self.session.refresh(mri_image)
+        return mri_image
+
+    def _image_keys(self, mri_image: MRIImage) -> list[str]:
+        keys = [mri_image.storage_key] if mri_image.storage_key else []
+        for formats in (mri_image.renditions or {}).values():
+            keys.extend(formats.values())
+        return keys
+
+    def purge_images(self, keys: list[str]):
+        # after the commit or rollback: deletes the unreferenced files
+        for key in self.storage_service.purge(keys):
+            delete_tensors(storage.cached_path(key))
+
+    async def _process_image(
+        self, imagefile: UploadFile
+    ) -> tuple[str, dict[str, str | dict[str, str]]]:
+        """Return the content hash and the staging paths: the main PNG and
+        the renditions by size and format."""
+        tmp_path, _ = await receive_image(imagefile, config["MRI_MAX_UPLOAD_BYTES"])
+        try:
+            png_filename, content_hash, renditions = await image_pool.run(
+                process_image_png,
+                tmp_path,
+                storage.staging_dir,
+                config["MRI_MAX_DIMENSION"],
+                config["MRI_MAX_PIXELS"],
+                config["MRI_RENDITION_SIZES"],
+                config["MRI_WEBP_QUALITY"],
+                config["MRI_WEBP_FULL_MAX_PIXELS"],
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            os.remove(tmp_path)
+        files = {
+            name: {
+                image_format: os.path.join(storage.staging_dir, filename)
+                for image_format, filename in formats.items()
+            }
+            for name, formats in renditions.items()
+        }
+        files["main"] = os.path.join(storage.staging_dir, png_filename)
+        return content_hash, files
+
+    async def _classify_image(
+        self, evaluation: Evaluation, path: str, content_hash: str
+    ):
+        # the model classification is computed by the server, not the client
+        cache_key = (content_hash, cnn_engine.version())
+        prediction = inference_cache.get(cache_key)
+        if prediction is None:
+            prediction = await run_in_threadpool(self._stored_prediction, *cache_key)
+        new = prediction is None
+        if new:
+            classification, probability = await cnn_engine.predict(path)
+            prediction = (classification, Decimal(f"{probability:.3f}"))
+        inference_cache.set(cache_key, prediction)
+        await run_in_threadpool(
+            self._save_classification, evaluation, cache_key, prediction, new
+        )
+
+    def _save_classification(
+        self,
+        evaluation: Evaluation,
+        cache_key: tuple[str, str],
+        prediction: tuple[Classification, Decimal],
+        new: bool,
+    ):
+        # blocking: runs in the threadpool, like _store_image
+        if new:
+            self._save_prediction(*cache_key, prediction)
+        evaluation.model_classification, evaluation.model_probability = prediction
+        self.session.add(evaluation)
+        self.session.commit()
+
+    def rescore_mri_images(self) -> int:
+        """Classify the images of the CNN evaluations again.
+
+        Reads the tensors stored at upload time (memory-mapped) and saves the
+        results with a batched UPDATE.
+        """
+        rows = [
+            (evaluation_id, storage.local_path(key))
+            for evaluation_id, key in self.session.exec(
+                select(MRIImage.evaluation_id, MRIImage.storage_key)
+                .join(Evaluation, Evaluation.id == MRIImage.evaluation_id)
+                .where(Evaluation.modality == Modality.CNN)
+            ).all()
+        ]
+        if not rows:
+            return 0
+        results = cnn_engine.predict_many([path for _, path in rows])
+        self.session.execute(
+            update(Evaluation),
+            [
+                {
+                    "id": evaluation_id,
+                    "model_classification": classification,
+                    "model_probability": Decimal(f"{probability:.3f}"),
+                }
+                for (evaluation_id, _), (classification, probability) in zip(
+                    rows, results
+                )
+            ],
+        )
+        self.session.commit()
+        return len(results)
+
+    def _stored_prediction(
+        self, content_hash: str, version: str
+    ) -> tuple[Classification, Decimal] | None:
+        row = self.session.exec(
+            select(InferenceCache.classification, InferenceCache.probability).where(
+                InferenceCache.content_hash == content_hash,
+                InferenceCache.model_version == version,
+            )
+        ).first()
+        return tuple(row) if row else None
+
+    def _save_prediction(
+        self,
+        content_hash: str,
+        version: str,
+        prediction: tuple[Classification, Decimal],
+    ):
+        self.session.add(
+            InferenceCache(
+                content_hash=content_hash,
+                model_version=version,
+                classification=prediction[0],
+                probability=prediction[1],
+            )
+        )
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # another request stored the same image and version concurrently
+            self.session.rollback()
+
     def delete_mri_image(self, evaluation_id: int) -> MRIImage:
-        mri_image = self.crud.get_by_foreign_key(
+        mri_image: MRIImage | None = self.crud.get_by_foreign_key(
             evaluation_id, MRIImage, "evaluation_id"
         )
-        if mri_image:
-            eliminar_imagen(mri_image.image_url, self.bucket_path)
-        return self.crud.delete_by_foreign_key(evaluation_id, MRIImage, "evaluation_id")
+        if not mri_image:
+            raise HTTPException(status_code=404, detail="MRI image not found.")
+        self.session.delete(mri_image)
+        # the files are only deleted if no other evaluation uses them
+        released = [
+            key
+            for key in self._image_keys(mri_image)
+            if self.storage_service.release(key)
+        ]
+        self.session.commit()
+        self.purge_images(released)
+        return mri_image
 
     # results methods
     def get_clinic_results_by_evaluation(self, evaluation_id: int) -> ClinicResults:
@@ -267,6 +698,242 @@ class EvaluationService:
             evaluation_id, ClinicResults, "evaluation_id"
         )
 
+    # bulk methods
+    def create_evaluations_bulk(self, user_id: int, items: list[dict]) -> dict:
+        valid, errors = self._validate_batch(items, EvaluationBulkItem)
+        valid, _ = self._authorize_batch(
+            valid,
+            "patient_id",
+            select(Patient.id, Patient.user_id).where(
+                Patient.id.in_({item.patient_id for _, item in valid})
+            ),
+            user_id,
+            "patient",
+            errors,
+        )
+        now = datetime.now(timezone.utc)
+        for _, item in valid:
+            if item.created_at is None:
+                item.created_at = now
+            elif item.created_at.tzinfo is None:
+                item.created_at = item.created_at.replace(tzinfo=timezone.utc)
+            else:
+                item.created_at = item.created_at.astimezone(timezone.utc)
+        # same rule as create_evaluation_of_patient: one evaluation per
+        # patient, day and modality
+        patient_ids = {item.patient_id for _, item in valid}
+        existing = (
+            self.session.exec(
+                select(
+                    Evaluation.patient_id,
+                    Evaluation.modality,
+                    func.date(Evaluation.created_at, type_=Date),
+                ).where(Evaluation.patient_id.in_(patient_ids))
+            ).all()
+            if patient_ids
+            else []
+        )
+        valid = self._drop_duplicates(
+            valid,
+            lambda item: (item.patient_id, item.modality, item.created_at.date()),
+            {tuple(row) for row in existing},
+            "A patient can only have one evaluation per day with the same modality.",
+            errors,
+        )
+        rows = [
+            (
+                index,
+                {
+                    # model_classification/probability are computed by the
+                    # server, as in create_evaluation_of_patient
+                    **item.model_dump(
+                        include={"patient_id", "modality", "manual_classification"}
+                    ),
+                    "created_at": item.created_at,
+                },
+            )
+            for index, item in valid
+        ]
+        return self._insert_batch(Evaluation, rows, errors)
+
+    def create_clinic_data_bulk(self, user_id: int, items: list[dict]) -> dict:
+        valid, errors = self._validate_batch(items, ClinicDataBulkItem)
+        valid, evaluations = self._authorize_evaluations_batch(valid, user_id, errors)
+        valid = self._drop_duplicates(
+            valid,
+            lambda item: item.evaluation_id,
+            self._evaluations_with(ClinicData, valid),
+            "Clinic data for this evaluation already exists.",
+            errors,
+        )
+        rows = [
+            (
+                index,
+                item.model_dump(include={"evaluation_id", *FEATURES}),
+            )
+            for index, item in valid
+        ]
+        # only RF evaluations are scored with the random forest
+        return self._insert_batch(
+            ClinicData,
+            rows,
+            errors,
+            before_commit=lambda clinics: self.score_clinic_data_batch(
+                [
+                    clinic
+                    for clinic in clinics
+                    if evaluations[clinic.evaluation_id].modality == Modality.RF
+                ]
+            ),
+        )
+
+    def create_clinic_results_bulk(self, user_id: int, items: list[dict]) -> dict:
+        valid, errors = self._validate_batch(items, ClinicResultsBulkItem)
+        valid, _ = self._authorize_evaluations_batch(valid, user_id, errors)
+        valid = self._drop_duplicates(
+            valid,
+            lambda item: item.evaluation_id,
+            self._evaluations_with(ClinicResults, valid),
+            "Clinic results for this evaluation already exist.",
+            errors,
+        )
+        rows = [(index, item.model_dump()) for index, item in valid]
+        return self._insert_batch(ClinicResults, rows, errors)
+
+    def _validate_batch(
+        self, items: list[dict], schema: type[BaseModel]
+    ) -> tuple[list[tuple[int, BaseModel]], list[dict]]:
+        # each item is validated on its own: an invalid one does not sink the batch
+        if len(items) > config["BULK_MAX_ITEMS"]:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {config['BULK_MAX_ITEMS']} items per request.",
+            )
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, schema.model_validate(item)))
+            except ValidationError as exc:
+                errors.append(
+                    {
+                        "index": index,
+                        "detail": exc.errors(include_url=False, include_context=False),
+                    }
+                )
+        return valid, errors
+
+    def _authorize_batch(
+        self, valid, field: str, query, user_id: int, resource: str, errors
+    ) -> tuple[list, dict]:
+        # query returns (id, user_id, ...) for every referenced resource; the
+        # rows are returned by id for callers that need the other columns
+        rows = {row[0]: row for row in self.session.exec(query).all()} if valid else {}
+        authorized = []
+        for index, item in valid:
+            row = rows.get(getattr(item, field))
+            owner = row[1] if row else None
+            if owner is None:
+                errors.append(
+                    {"index": index, "detail": f"{resource.capitalize()} not found"}
+                )
+            elif owner != user_id:
+                detail = f"You do not have permission to access this {resource}"
+                errors.append({"index": index, "detail": detail})
+            else:
+                authorized.append((index, item))
+        return authorized, rows
+
+    def _authorize_evaluations_batch(
+        self, valid, user_id: int, errors
+    ) -> tuple[list, dict]:
+        return self._authorize_batch(
+            valid,
+            "evaluation_id",
+            select(Evaluation.id, Patient.user_id, Evaluation.modality)
+            .join(Patient)
+            .where(Evaluation.id.in_({item.evaluation_id for _, item in valid})),
+            user_id,
+            "evaluation",
+            errors,
+        )
+
+    def _evaluations_with(self, model, valid) -> set[int]:
+        if not valid:
+            return set()
+        return set(
+            self.session.exec(
+                select(model.evaluation_id).where(
+                    model.evaluation_id.in_({item.evaluation_id for _, item in valid})
+                )
+            ).all()
+        )
+
+    def _drop_duplicates(
+        self, valid, key_of, existing: set, detail: str, errors
+    ) -> list:
+        # against the database and against earlier items of the same batch
+        seen = set(existing)
+        unique = []
+        for index, item in valid:
+            if key_of(item) in seen:
+                errors.append({"index": index, "detail": detail})
+            else:
+                seen.add(key_of(item))
+                unique.append((index, item))
+        return unique
+
+    def _insert_batch(
+        self, model, rows: list[tuple[int, dict]], errors, before_commit=None
+    ) -> dict:
+        """Insert every row with a batched INSERT ... RETURNING.
+
+        Everything runs in one transaction: either all valid rows go in or
+        none do. Per-item errors are returned alongside what was created.
+        """
+        created = []
+        if rows:
+            now = datetime.now(timezone.utc)
+            try:
+                objects = self.session.scalars(
+                    insert(model).returning(model, sort_by_parameter_order=True),
+                    [{"created_at": now, "updated_at": now, **row} for _, row in rows],
+                ).all()
+                if before_commit:
+                    before_commit(objects)
+                # before the commit, which expires the objects
+                created = [
+                    {"index": index, **obj.model_dump()}
+                    for (index, _), obj in zip(rows, objects)
+                ]
+                self.session.commit()
+            except IntegrityError:
+                self.session.rollback()
+                raise HTTPException(
+                    status_code=409,
+                    detail="Some rows were created concurrently; nothing was saved.",
+                )
+        return {
+            "created": created,
+            "errors": sorted(errors, key=lambda error: error["index"]),
+        }
+
+    def score_clinic_data_batch(self, clinics: list[ClinicData]):
+        # a single predict_proba and a batched UPDATE, like rescore_clinic_data
+        results = rf_engine.score_matrix(feature_matrix(clinics))
+        if not results:
+            return
+        self.session.execute(
+            update(Evaluation),
+            [
+                {
+                    "id": clinic.evaluation_id,
+                    "model_classification": classification,
+                    "model_probability": probability,
+                }
+                for clinic, (classification, probability) in zip(clinics, results)
+            ],
+        )
+
     def generate_evaluations_pdf(self, patient, evaluations) -> bytes:
         # Lógica para generar el PDF de las evaluaciones de un paciente
         return generate_evaluations_pdf(patient, evaluations)
@@ -277,7 +944,35 @@ class EvaluationService:
         subject = "Reporte PDF de Evaluaciones"
         body = "Adjunto el reporte solicitado."
         filename = f"evaluations_patient_{patient_id}.pdf"
-        send_pdf_report_email(email, pdf_bytes, patient_id)
+        send_pdf_report_email(self.session, email, pdf_bytes, patient_id)
+
+
+class AsyncEvaluationService(AsyncService):
+    async def get_evaluations_fingerprint(
+        self, user_id: int, filters: dict
+    ) -> tuple[datetime | None, int]:
+        query = _evaluations_fingerprint_query(user_id, filters)
+        return tuple((await self.session.exec(query)).one())
+
+    async def get_evaluations(
+        self,
+        user_id: int,
+        filters: dict,
+        skip: int = 0,
+        limit: int = 10,
+        total: int | None = None,
+    ) -> tuple[list[dict], int]:
+        if total is None:
+            query = _evaluations_count_query(user_id, filters)
+            total = (await self.session.exec(query)).one()
+        query = _evaluations_page_query(user_id, filters, skip, limit)
+        return _evaluation_rows_to_dicts((await self.session.exec(query)).all()), total
+
+    async def get_evaluations_after(
+        self, user_id: int, filters: dict, after: str | None, limit: int = 10
+    ) -> tuple[list[dict], str | None]:
+        query = _evaluations_after_query(user_id, filters, after, limit)
+        return _evaluations_after_page((await self.session.exec(query)).all(), limit)
 
 
 def traducir_enum(valor):
@@ -300,13 +995,39 @@ def traducir_enum(valor):
     return traducciones.get(str(valor), str(valor))
 
 
+pdf_cache = DiskLRUCache(
+    config["PDF_CACHE_DIR"], max_bytes=config["PDF_CACHE_MAX_BYTES"], suffix=".pdf"
+)
+
+
+def pdf_cache_key(patient: Patient, evaluations: list[Evaluation]) -> str:
+    # everything the template renders is versioned by an updated_at stamp, so
+    # editing an evaluation, its clinic results, the patient or the template
+    # yields a new key and stale PDFs simply age out of the LRU
+    parts = [
+        f"template:{report_renderer.version()}",
+        f"patient:{patient.id}:{patient.updated_at}",
+    ]
+    for evaluation in evaluations:
+        clinic_result = evaluation.clinic_result
+        parts.append(
+            f"evaluation:{evaluation.id}:{evaluation.updated_at}:"
+            f"{clinic_result.id if clinic_result else None}:"
+            f"{clinic_result.updated_at if clinic_result else None}"
+        )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
 def generate_evaluations_pdf(patient: Patient, evaluations: list[Evaluation]) -> bytes:
-    # load HTML template
-    with open(
-        "app/evaluations/template/generate_evaluation.html", "r", encoding="utf-8"
-    ) as file:
-        html_template = file.read()
-    template = Template(html_template)
+    cache_key = pdf_cache_key(patient, evaluations)
+    pdf_bytes = pdf_cache.get(cache_key)
+    if pdf_bytes is None:
+        pdf_bytes = render_evaluations_pdf(patient, evaluations)
+        pdf_cache.set(cache_key, pdf_bytes)
+    return pdf_bytes
+
+
+def render_evaluations_pdf(patient: Patient, evaluations: list[Evaluation]) -> bytes:
     evaluations_results = []
     for idx, i in enumerate(evaluations):
         if i.clinic_result and i.clinic_result.description:
@@ -319,18 +1040,18 @@ def generate_evaluations_pdf(patient: Patient, evaluations: list[Evaluation]) ->
                     }
                 )
 
-    html_content = template.render(
+    return report_renderer.render_pdf(
         patient=patient,
         evaluations=evaluations,
         traducir_enum=traducir_enum,
         formatear_fecha=formatear_fecha,
         evaluations_results=evaluations_results,
     )
-    pdf_bytes = HTML(string=html_content).write_pdf()
-    return pdf_bytes
 
 
-def send_pdf_report_email(email: str, pdf_bytes: bytes, patient_id: int) -> None:
+def send_pdf_report_email(
+    session: Session, email: str, pdf_bytes: bytes, patient_id: int
+) -> None:
     msg = MIMEMultipart()
     msg["Subject"] = "Reporte PDF de Evaluaciones - Intellicog"
     msg["From"] = config["EMAIL_SENDER"]
@@ -360,9 +1081,7 @@ def send_pdf_report_email(email: str, pdf_bytes: bytes, patient_id: int) -> None
     )
     msg.attach(part)
 
-    with smtplib.SMTP_SSL(config["EMAIL_HOST"], config["EMAIL_PORT"]) as smtp:
-        smtp.login(config["EMAIL_SENDER"], config["EMAIL_PASSWORD"])
-        smtp.sendmail(config["EMAIL_SENDER"], [email], msg.as_string())
+    OutboxService(session).enqueue(msg, email)
 
 
 def formatear_fecha(fecha):
@@ -1,31 +1,166 @@
-from PIL import Image
-import io
+from ..core.config import config
+from ..core.executors import BoundedProcessPool
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps
+import hashlib
 import os
+import tempfile
 from uuid import uuid4
 
+# image decoding and encoding off the event loop
+image_pool = BoundedProcessPool(
+    name="image processing",
+    max_workers=config["IMAGE_WORKERS"],
+    max_pending=config["IMAGE_MAX_PENDING"],
+    retry_after=config["IMAGE_RETRY_AFTER_SECONDS"],
+)
 
-def validar_imagen(content_type: str):
-    if not content_type.startswith("image/"):
-        raise ValueError("El archivo no es una imagen válida.")
+CHUNK_SIZE = 1024 * 1024
 
+IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "PNG",
+    b"\xff\xd8\xff": "JPEG",
+    b"GIF87a": "GIF",
+    b"GIF89a": "GIF",
+    b"BM": "BMP",
+    b"II*\x00": "TIFF",
+    b"MM\x00*": "TIFF",
+}
 
-def convertir_a_png(contenido_bytes: bytes) -> Image.Image:
+# modes PNG stores without a prior conversion
+PNG_MODES = {"1", "L", "LA", "I", "I;16", "P", "RGB", "RGBA"}
+WEBP_MODES = {"L", "RGB", "RGBA"}
+
+
+def detect_format(header: bytes) -> str | None:
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+async def receive_image(imagefile: UploadFile, max_bytes: int) -> tuple[str, str]:
+    """Copy the upload to a temporary file in chunks.
+
+    Stops as soon as ``max_bytes`` is exceeded and checks the format from
+    the first bytes, before anything is decoded. Returns the temporary path
+    (the caller deletes it) and the detected format.
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".upload")
+    total = 0
+    image_format = None
     try:
-        imagen = Image.open(io.BytesIO(contenido_bytes))
-        return imagen.convert("RGBA")
-    except Exception as e:
-        raise ValueError(f"No se pudo procesar la imagen: {e}")
+        with os.fdopen(fd, "wb") as dest:
+            while chunk := await imagefile.read(CHUNK_SIZE):
+                if image_format is None:
+                    image_format = detect_format(chunk[:16])
+                    if image_format is None:
+                        raise HTTPException(
+                            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail="Formato de imagen no soportado.",
+                        )
+                total += len(chunk)
+                if total > max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"La imagen supera el máximo de {max_bytes} bytes.",
+                    )
+                dest.write(chunk)
+        if image_format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El archivo está vacío.",
+            )
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, image_format
+
+
+def save_image(image: Image.Image, path: str, image_format: str, **params) -> str:
+    filename = f"{uuid4().hex}.{image_format.lower()}"
+    image.save(os.path.join(path, filename), format=image_format, **params)
+    return filename
 
 
 def guardar_imagen_png(imagen: Image.Image, path: str) -> str:
-    nombre_archivo = f"{uuid4().hex}.png"
-    ruta = os.path.join(path, nombre_archivo)
-    imagen.save(ruta, format="PNG")
-    return nombre_archivo
+    return save_image(imagen, path, "PNG")
+
 
+def save_image_webp(image: Image.Image, path: str, quality: int) -> str:
+    if image.mode in ("I", "I;16"):
+        # WebP has 8 bits per channel: rescale the 16-bit range
+        image = image.convert("I").point(lambda v: v * (1 / 256)).convert("L")
+    if image.mode not in WEBP_MODES:
+        image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    return save_image(image, path, "WEBP", quality=quality, method=4)
 
-def eliminar_imagen(ruta: str):
-    if os.path.exists(ruta):
-        os.remove(ruta)
-    else:
-        raise FileNotFoundError(f"La imagen {ruta} no existe.")
+
+def generate_renditions(
+    image: Image.Image,
+    path: str,
+    sizes: tuple[int, ...],
+    webp_quality: int,
+    webp_max_pixels: int,
+) -> dict[str, dict[str, str]]:
+    """Reduced copies for listings: {"128": {"webp": filename, "png": ...}}.
+
+    Only sizes smaller than the image are generated; "full" holds the WebP
+    at the original size (the original PNG is the main file).
+    """
+    renditions = {}
+    for size in sorted(sizes):
+        if size >= max(image.size):
+            continue
+        # contain() only allocates the reduced image, not a full-size copy
+        reduced = ImageOps.contain(image, (size, size), Image.LANCZOS)
+        renditions[str(size)] = {
+            "webp": save_image_webp(reduced, path, webp_quality),
+            "png": guardar_imagen_png(reduced, path),
+        }
+    # libwebp works on a 32-bit ARGB copy of the picture (plus Pillow's RGB
+    # conversion of grayscale scans), about 9 bytes per pixel; above the cap
+    # "full" is left out and readers fall back to the original PNG
+    if image.width * image.height <= webp_max_pixels:
+        renditions["full"] = {"webp": save_image_webp(image, path, webp_quality)}
+    return renditions
+
+
+def pixel_hash(image: Image.Image) -> str:
+    # SHA-256 of the normalized pixels, independent of the encoding
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def process_image_png(
+    source_path: str,
+    path: str,
+    max_dimension: int,
+    max_pixels: int,
+    sizes: tuple[int, ...] = (),
+    webp_quality: int = 85,
+    webp_max_pixels: int = 0,
+) -> tuple[str, str, dict[str, dict[str, str]]]:
+    # runs in an image_pool process; only filenames and the hash travel back,
+    # and the renditions come from the same decoded image
+    try:
+        with Image.open(source_path) as image:
+            if image.width * image.height > max_pixels:
+                raise ValueError("La imagen excede el número máximo de píxeles.")
+            if max(image.size) > max_dimension:
+                # thumbnail uses draft(): JPEG is decoded already reduced
+                image.thumbnail((max_dimension, max_dimension))
+            if image.mode not in PNG_MODES:
+                image = image.convert("RGBA")
+            return (
+                guardar_imagen_png(image, path),
+                pixel_hash(image),
+                generate_renditions(image, path, sizes, webp_quality, webp_max_pixels),
+            )
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"No se pudo procesar la imagen: {e}")
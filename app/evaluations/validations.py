@@ -31,31 +31,54 @@ def is_evaluation_of_my_patient(
     token_data: current_user_dependency,
     evaluation_id: int,
     service: evaluation_service_dependency,
-    patient_service: patient_service_dependency,
     user_service: user_service_dependency,
     request: Request,
 ):
     if not evaluation_id:
         raise HTTPException(status_code=400, detail="Evaluation ID is required")
-    evaluation = service.get_evaluation(evaluation_id)
-    if not evaluation:
+    # evaluations already authorized during this request
+    owned = getattr(request.state, "owned_evaluations", None)
+    if owned is None:
+        owned = request.state.owned_evaluations = {}
+    if evaluation_id in owned:
+        return owned[evaluation_id]
+
+    user_id = get_current_user_info(token_data, user_service, request)
+    row = service.get_evaluation_with_owner(evaluation_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Evaluation not found")
-    patient_id = evaluation.patient_id
-    if not patient_id:
+    evaluation, owner_id = row
+    if owner_id != user_id:
         raise HTTPException(
-            status_code=404, detail="Patient ID not found in evaluation"
+            status_code=403,
+            detail="You do not have permission to access this evaluation",
         )
-    patient = patient_service.get_patient(patient_id)
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    owned[evaluation_id] = evaluation
+    return evaluation
+
+
+def get_full_evaluation_of_my_patient(
+    token_data: current_user_dependency,
+    evaluation_id: int,
+    service: evaluation_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    # like is_evaluation_of_my_patient, but the same query also loads the
+    # patient, clinic data, MRI image and clinic results
+    if not evaluation_id:
+        raise HTTPException(status_code=400, detail="Evaluation ID is required")
     user_id = get_current_user_info(token_data, user_service, request)
-    if patient.user_id != user_id:
+    evaluation = service.get_evaluation_full(evaluation_id)
+    if not evaluation:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    if evaluation.patient.user_id != user_id:
         raise HTTPException(
             status_code=403,
             detail="You do not have permission to access this evaluation",
         )
-
-    if not patient_id:
-        raise HTTPException(status_code=400, detail="Patient ID is required")
-    if not patient_service.get_patient(patient_id):
-        raise HTTPException(status_code=404, detail="Patient not found")
+    owned = getattr(request.state, "owned_evaluations", None)
+    if owned is None:
+        owned = request.state.owned_evaluations = {}
+    owned[evaluation_id] = evaluation
+    return evaluation
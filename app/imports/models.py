@@ -0,0 +1,41 @@
+from ..utils import DraftModel
+from datetime import datetime
+from enum import Enum as PyEnum
+from sqlalchemy import JSON
+from sqlmodel import Field, Column, Enum as SQLEnum, Index
+from typing import Optional
+
+
+class ImportStatus(PyEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ImportJob(DraftModel, table=True):
+    __table_args__ = (Index("ix_importjob_status_locked_at", "status", "locked_at"),)
+
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    filename: str = Field(max_length=255)
+    # uploaded file, kept through the app/storage driver until the job ends
+    storage_key: str = Field(max_length=255)
+
+    status: ImportStatus = Field(
+        default=ImportStatus.PENDING,
+        sa_column=Column(SQLEnum(ImportStatus), nullable=False),
+    )
+    progress: int = Field(default=0)
+    total_rows: Optional[int] = Field(default=None, nullable=True)
+    # data rows already imported; committed with each chunk, so an
+    # interrupted import resumes where it stopped
+    processed_rows: int = Field(default=0)
+    created_patients: int = Field(default=0)
+    updated_patients: int = Field(default=0)
+    created_evaluations: int = Field(default=0)
+    # [{"row": row number in the sheet, "detail": ...}]
+    row_errors: Optional[list] = Field(default=None, sa_column=Column(JSON))
+
+    attempts: int = Field(default=0)
+    locked_at: Optional[datetime] = Field(default=None, nullable=True)
+    error: Optional[str] = Field(default=None, nullable=True)
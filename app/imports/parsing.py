@@ -0,0 +1,135 @@
+from ..evaluations.schemas import ClinicDataModel
+from ..evaluations.scoring import FEATURES
+from ..patients.schemas import PatientModel
+from decimal import Decimal
+from typing import Iterator
+import csv
+import pandas as pd
+
+PATIENT_COLUMNS = ("dni", "name", "last_name", "sex", "age")
+FORMATS = {".csv": "csv", ".xlsx": "xlsx"}
+# Numeric(6, 2) of ClinicData
+MAX_SCORE = Decimal("9999.99")
+
+
+def file_format(filename: str) -> str | None:
+    for extension, fmt in FORMATS.items():
+        if filename.lower().endswith(extension):
+            return fmt
+    return None
+
+
+def _text(value) -> str:
+    # Excel cells arrive typed: 12345678.0 must read as "12345678"
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _delimiter(path: str) -> str:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        sample = f.read(64 * 1024)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def count_rows(path: str, fmt: str) -> int:
+    """Data rows (without the header), to report progress."""
+    if fmt == "xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            return max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    lines = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            lines += chunk.count(b"\n")
+    return max(lines - 1, 0)
+
+
+def _csv_chunks(path: str, size: int) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(
+        path,
+        sep=_delimiter(path),
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8-sig",
+        chunksize=size,
+    )
+
+
+def _xlsx_chunks(path: str, size: int) -> Iterator[pd.DataFrame]:
+    # read_only mode: openpyxl walks the sheet without loading all of it
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [_text(value) for value in next(rows, ())]
+        chunk = []
+        for row in rows:
+            chunk.append([_text(value) for value in row])
+            if len(chunk) == size:
+                yield pd.DataFrame(chunk, columns=header)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path: str, fmt: str, size: int, skip: int = 0) -> Iterator[list[dict]]:
+    """Walk the file in chunks of ``size`` rows.
+
+    Each row is a dict with the normalized columns (lowercase, no
+    surrounding spaces) and ``row``, its number in the sheet counting the
+    header. The first ``skip`` data rows are left out, to resume an import.
+    """
+    read = _xlsx_chunks if fmt == "xlsx" else _csv_chunks
+    start = 0
+    for chunk in read(path, size):
+        chunk.columns = [str(column).strip().lower() for column in chunk.columns]
+        missing = [c for c in PATIENT_COLUMNS if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        chunk["row"] = range(start + 2, start + 2 + len(chunk))
+        start += len(chunk)
+        if start <= skip:
+            continue
+        records = chunk.iloc[max(skip - (start - len(chunk)), 0) :].to_dict("records")
+        # empty rows (common at the end of an Excel sheet)
+        yield [r for r in records if any(r.get(c) for c in PATIENT_COLUMNS)]
+
+
+def validate_row(record: dict) -> tuple[PatientModel, ClinicDataModel | None]:
+    """One sheet row -> the patient and, if it has scores, its clinic data.
+
+    Raises ``ValidationError`` or ``ValueError`` if the row is not valid.
+    """
+    data = {c: record.get(c) or None for c in PATIENT_COLUMNS}
+    if data["sex"]:
+        data["sex"] = data["sex"].upper()
+    patient = PatientModel.model_validate(data)
+    for field in ("name", "last_name"):
+        if len(getattr(patient, field)) > 50:
+            raise ValueError(f"{field} is longer than 50 characters")
+
+    scores = {
+        field: record[field].replace(",", ".")
+        for field in FEATURES
+        if record.get(field)
+    }
+    if not scores:
+        return patient, None
+    clinic = ClinicDataModel.model_validate(scores)
+    for field in scores:
+        if abs(getattr(clinic, field)) > MAX_SCORE:
+            raise ValueError(f"{field} is out of range")
+    return patient, clinic
@@ -0,0 +1,55 @@
+from ..auth.router import (
+    current_user_dependency,
+    get_current_user_info,
+    user_service_dependency,
+)
+from ..core.config import config
+from ..core.database import SessionDep
+from ..core.uploads import BodyLimitRoute, max_body_size
+from .schemas import ImportJobRead
+from .service import ImportService
+from .worker import import_worker
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+from typing import Annotated
+
+
+def get_import_service(session: SessionDep) -> ImportService:
+    return ImportService(session)
+
+
+import_service_dependency = Annotated[ImportService, Depends(get_import_service)]
+
+
+imports_router = APIRouter(
+    prefix="/imports", tags=["Imports"], route_class=BodyLimitRoute
+)
+
+
+@imports_router.post("", status_code=202)
+@max_body_size(config["IMPORT_MAX_UPLOAD_BYTES"])
+async def create_import_job(
+    tokendata: current_user_dependency,
+    file: UploadFile,
+    service: import_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(tokendata, user_service, request)
+    job = await service.create_job(user_id, file)
+    import_worker.notify()
+    return ImportJobRead.model_validate(job, from_attributes=True)
+
+
+@imports_router.get("/{job_id}")
+def get_import_job(
+    tokendata: current_user_dependency,
+    job_id: int,
+    service: import_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(tokendata, user_service, request)
+    job = service.get_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ImportJobRead.model_validate(job, from_attributes=True)
@@ -0,0 +1,19 @@
+from .models import ImportStatus
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ImportJobRead(BaseModel):
+    id: int
+    status: ImportStatus
+    filename: str
+    progress: int
+    total_rows: Optional[int] = None
+    processed_rows: int
+    created_patients: int
+    updated_patients: int
+    created_evaluations: int
+    row_errors: Optional[list] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,310 @@
+from ..core.config import config
+from ..evaluations.scoring import FEATURES
+from ..evaluations.service import EvaluationService
+from ..storage.drivers import storage
+from ..utils import CRUDDraft
+from .models import ImportJob, ImportStatus
+from .parsing import count_rows, file_format, read_chunks, validate_row
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import and_, or_, text, update
+from sqlmodel import Session, select
+import os
+import uuid
+
+CHUNK_SIZE = 1024 * 1024
+# an .xlsx file is a zip
+XLSX_SIGNATURE = b"PK\x03\x04"
+
+STAGING_COLUMNS = (
+    "sheet_row",
+    "dni",
+    "name",
+    "last_name",
+    "sex",
+    "age",
+    *FEATURES,
+    "has_scores",
+)
+
+CREATE_STAGING = f"""
+CREATE TEMP TABLE import_row (
+    sheet_row integer NOT NULL,
+    dni text NOT NULL,
+    name text NOT NULL,
+    last_name text NOT NULL,
+    sex text NOT NULL,
+    age integer NOT NULL,
+    {", ".join(f"{field} numeric(6, 2)" for field in FEATURES)},
+    has_scores boolean NOT NULL
+) ON COMMIT DROP
+"""
+
+# the rows come with no repeated dni, so each patient is touched once
+MERGE_PATIENTS = text("""
+INSERT INTO patient (user_id, dni, name, last_name, sex, age, created_at, updated_at)
+SELECT :user_id, dni, name, last_name, CAST(sex AS sex), age, :now, :now
+FROM import_row
+ON CONFLICT (user_id, dni) DO UPDATE SET
+    name = excluded.name,
+    last_name = excluded.last_name,
+    sex = excluded.sex,
+    age = excluded.age,
+    updated_at = excluded.updated_at
+RETURNING id, dni, xmax = 0 AS created
+""")
+
+# one RF evaluation with its clinic data per row with scores, keeping the
+# one evaluation per patient, day and modality rule
+CREATE_EVALUATIONS = text(f"""
+WITH new_evaluation AS (
+    INSERT INTO evaluation (patient_id, modality, created_at, updated_at)
+    SELECT p.id, CAST('RF' AS modality), :now, :now
+    FROM import_row r
+    JOIN patient p ON p.user_id = :user_id AND p.dni = r.dni
+    WHERE r.has_scores AND NOT EXISTS (
+        SELECT 1 FROM evaluation e
+        WHERE e.patient_id = p.id
+          AND e.modality = 'RF'
+          AND CAST(e.created_at AS date) = CAST(:now AS date)
+    )
+    RETURNING id, patient_id
+), new_clinic_data AS (
+    INSERT INTO clinicdata (
+        evaluation_id, {", ".join(FEATURES)}, created_at, updated_at
+    )
+    SELECT n.id, {", ".join(f"r.{field}" for field in FEATURES)},
+        :now, :now
+    FROM new_evaluation n
+    JOIN patient p ON p.id = n.patient_id
+    JOIN import_row r ON r.dni = p.dni
+    RETURNING evaluation_id, {", ".join(FEATURES)}
+)
+SELECT new_clinic_data.*, new_evaluation.patient_id
+FROM new_clinic_data
+JOIN new_evaluation ON new_evaluation.id = new_clinic_data.evaluation_id
+""")
+
+
+class ImportService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.crud = CRUDDraft(self.session)
+
+    async def create_job(self, user_id: int, file: UploadFile) -> ImportJob:
+        fmt = file_format(file.filename or "")
+        if fmt is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Only .csv and .xlsx files are supported.",
+            )
+        extension = os.path.splitext(file.filename)[1].lower()
+        path = storage.staging_file(suffix=extension)
+        total = 0
+        try:
+            with open(path, "wb") as dest:
+                while chunk := await file.read(CHUNK_SIZE):
+                    if total == 0 and fmt == "xlsx":
+                        if not chunk.startswith(XLSX_SIGNATURE):
+                            raise HTTPException(
+                                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                detail="The file is not a valid .xlsx file.",
+                            )
+                    total += len(chunk)
+                    if total > config["IMPORT_MAX_UPLOAD_BYTES"]:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="The file exceeds "
+                            f"{config['IMPORT_MAX_UPLOAD_BYTES']} bytes.",
+                        )
+                    dest.write(chunk)
+            if total == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="The file is empty.",
+                )
+            key = f"{config['IMPORT_STORAGE_PREFIX']}{uuid.uuid4().hex}{extension}"
+            await run_in_threadpool(storage.put, path, key)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+        job = ImportJob(user_id=user_id, filename=file.filename[:255], storage_key=key)
+        try:
+            return await run_in_threadpool(self.crud.create, job, ImportJob)
+        except BaseException:
+            await run_in_threadpool(storage.delete, key)
+            raise
+
+    def get_job(self, job_id: int, user_id: int) -> ImportJob | None:
+        statement = select(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.user_id == user_id
+        )
+        return self.session.exec(statement).first()
+
+    def claim_next_job(self) -> ImportJob | None:
+        now = datetime.now(timezone.utc)
+        lease_expired = now - timedelta(seconds=config["IMPORT_JOB_LEASE_SECONDS"])
+        # imports whose last allowed attempt died: nothing would ever finish
+        # them, nor delete the uploaded file
+        exhausted = self.session.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.status == ImportStatus.RUNNING,
+                ImportJob.locked_at < lease_expired,
+                ImportJob.attempts >= config["IMPORT_JOB_MAX_ATTEMPTS"],
+            )
+            .values(
+                status=ImportStatus.FAILED,
+                error="The import was interrupted too many times",
+                updated_at=now,
+            )
+            .returning(ImportJob.storage_key)
+        ).all()
+        statement = (
+            select(ImportJob)
+            .where(
+                ImportJob.attempts < config["IMPORT_JOB_MAX_ATTEMPTS"],
+                or_(
+                    ImportJob.status == ImportStatus.PENDING,
+                    # imports whose worker died mid-file (restart, crash)
+                    and_(
+                        ImportJob.status == ImportStatus.RUNNING,
+                        ImportJob.locked_at < lease_expired,
+                    ),
+                ),
+            )
+            .order_by(ImportJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = self.session.exec(statement).first()
+        if job:
+            # progress is kept: the import resumes from processed_rows
+            job.status = ImportStatus.RUNNING
+            job.locked_at = now
+            job.attempts += 1
+            self.session.add(job)
+        self.session.commit()
+        for (key,) in exhausted:
+            storage.delete(key)
+        return job
+
+    def run_job(self, job: ImportJob) -> None:
+        try:
+            path = storage.local_path(job.storage_key)
+            fmt = file_format(job.filename)
+            if job.total_rows is None:
+                job.total_rows = count_rows(path, fmt)
+                self.session.add(job)
+                self.session.commit()
+            for records in read_chunks(
+                path, fmt, config["IMPORT_CHUNK_ROWS"], skip=job.processed_rows
+            ):
+                self._import_chunk(job, records)
+            job.status = ImportStatus.DONE
+            job.progress = 100
+            self.session.add(job)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            job.status = ImportStatus.FAILED
+            job.error = str(e) or e.__class__.__name__
+            self.session.add(job)
+            self.session.commit()
+        storage.delete(job.storage_key)
+
+    def _import_chunk(self, job: ImportJob, records: list[dict]) -> None:
+        """Import a chunk of rows in a single transaction.
+
+        The valid rows are COPYed into a temporary table and merged from
+        there with two statements: an upsert of patients by
+        ``(user_id, dni)`` and the creation of evaluations with their clinic
+        data. The job's progress is committed in the same transaction.
+        """
+        errors = []
+        valid = {}
+        for record in records:
+            try:
+                patient, clinic = validate_row(record)
+            except ValidationError as exc:
+                errors.append(
+                    {
+                        "row": record["row"],
+                        "detail": exc.errors(include_url=False, include_context=False),
+                    }
+                )
+                continue
+            except ValueError as exc:
+                errors.append({"row": record["row"], "detail": str(exc)})
+                continue
+            # one patient per dni: the last row wins
+            valid[patient.dni] = (record["row"], patient, clinic)
+
+        if valid:
+            now = datetime.now(timezone.utc)
+            self._copy_to_staging(valid.values())
+            patients = self.session.execute(
+                MERGE_PATIENTS, {"user_id": job.user_id, "now": now}
+            ).all()
+            created = self.session.execute(
+                CREATE_EVALUATIONS, {"user_id": job.user_id, "now": now}
+            ).all()
+            EvaluationService(self.session).score_clinic_data_batch(created)
+
+            evaluated = {row.patient_id for row in created}
+            for patient in patients:
+                row, _, clinic = valid[patient.dni]
+                if clinic is not None and patient.id not in evaluated:
+                    errors.append(
+                        {
+                            "row": row,
+                            "detail": "A patient can only have one evaluation "
+                            "per day with the same modality.",
+                        }
+                    )
+            new_patients = sum(1 for patient in patients if patient.created)
+            job.created_patients += new_patients
+            job.updated_patients += len(patients) - new_patients
+            job.created_evaluations += len(created)
+
+        if errors:
+            previous = job.row_errors or []
+            room = max(config["IMPORT_MAX_ROW_ERRORS"] - len(previous), 0)
+            errors.sort(key=lambda error: error["row"])
+            job.row_errors = previous + errors[:room]
+        if records:
+            job.processed_rows = records[-1]["row"] - 1
+        if job.total_rows:
+            job.progress = min(99, job.processed_rows * 100 // job.total_rows)
+        job.locked_at = datetime.now(timezone.utc)
+        self.session.add(job)
+        self.session.commit()
+
+    def _copy_to_staging(self, valid) -> None:
+        connection = self.session.connection()
+        connection.exec_driver_sql(CREATE_STAGING)
+        # COPY goes through the psycopg connection, inside the same transaction
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            with cursor.copy(
+                f"COPY import_row ({', '.join(STAGING_COLUMNS)}) FROM STDIN"
+            ) as copy:
+                for row, patient, clinic in valid:
+                    copy.write_row(
+                        (
+                            row,
+                            patient.dni,
+                            patient.name,
+                            patient.last_name,
+                            patient.sex.name,
+                            patient.age,
+                            *(
+                                getattr(clinic, field) if clinic else None
+                                for field in FEATURES
+                            ),
+                            clinic is not None,
+                        )
+                    )
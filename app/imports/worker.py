@@ -0,0 +1,31 @@
+from ..core.config import config
+from ..core.database import engine
+from ..core.workers import PollingWorker
+from .service import ImportService
+from sqlmodel import Session
+
+
+class ImportWorker(PollingWorker):
+    """Loads queued spreadsheet imports.
+
+    Like the report worker, jobs live in the database (``importjob``) and
+    the uploaded file in the storage driver, so any API process can run
+    them. Progress is committed per chunk, and a job whose lease expires is
+    resumed from its last committed row.
+    """
+
+    name = "import-worker"
+
+    def process_once(self) -> bool:
+        with Session(engine) as session:
+            service = ImportService(session)
+            job = service.claim_next_job()
+            if not job:
+                return False
+            service.run_job(job)
+            return True
+
+
+import_worker = ImportWorker(
+    workers=config["IMPORT_WORKERS"], poll_seconds=config["IMPORT_POLL_SECONDS"]
+)
@@ -1,11 +1,23 @@
 from .auth.router import auth_router
+from .auth.utils import password_pool
 from .core.config import config
-from .core.database import init_db
+from .core.database import engine, init_db
+from .core.static import ImmutableStaticFiles
 from .evaluations.router import evaluations_router
+from .evaluations.inference import cnn_engine, inference_cache
+from .evaluations.rendering import report_renderer
+from .evaluations.scoring import rf_engine
+from .evaluations.service import pdf_cache
+from .evaluations.utils import image_pool
+from .imports.router import imports_router
+from .imports.worker import import_worker
+from .outbox.worker import outbox_worker
 from .patients.router import patients_router
+from .reports.router import reports_router
+from .reports.worker import report_worker
 from .users.router import user_router
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from .users.service import user_cache
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 import os
 
@@ -19,12 +31,14 @@ env = config["ENVIRONMENT"]
 
 
 bucket_local = config["S3_BUCKET_NAME"]
-os.makedirs(f"app/{bucket_local}", exist_ok=True)
-app.mount(
-    f"/{bucket_local}",
-    StaticFiles(directory=f"app/{bucket_local}"),
-    name=bucket_local,
-)
+if config["STORAGE_DRIVER"] == "local":
+    # with S3 the images are served from the bucket
+    os.makedirs(config["STORAGE_LOCAL_ROOT"], exist_ok=True)
+    app.mount(
+        f"/{bucket_local}",
+        ImmutableStaticFiles(directory=config["STORAGE_LOCAL_ROOT"]),
+        name=bucket_local,
+    )
 
 
 origins = [
@@ -38,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permitir todos los métodos HTTP
     allow_headers=["*"],  # Permitir todos los encabezados
+    expose_headers=["X-Total-Count"],  # Total de registros en listados paginados
 )
 
 
@@ -45,6 +60,8 @@ app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(patients_router)
 app.include_router(evaluations_router)
+app.include_router(reports_router)
+app.include_router(imports_router)
 
 
 @app.get("/")
@@ -52,8 +69,40 @@ async def ping():
     return {"message": "Welcome to IntelliCog Management API!"}
 
 
+# opt-in: exposes pool, cache and worker internals
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not config["METRICS_ENABLED"]:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return {
+        "user_cache": user_cache.stats(),
+        "db_pool": engine.pool.metrics(),
+        "image_pool": image_pool.stats(),
+        "cnn_engine": cnn_engine.stats(),
+        "inference_cache": inference_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "pdf_cache": pdf_cache.stats(),
+    }
+
+
 # on init actions here if needed
 @app.on_event("startup")
 async def startup_event():
     print(f"Starting IntelliCog API in {env} environment")
     init_db()
+    report_renderer.load()
+    cnn_engine.load()
+    rf_engine.load()
+    report_worker.start()
+    import_worker.start()
+    outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    report_worker.stop()
+    import_worker.stop()
+    outbox_worker.stop()
+    image_pool.shutdown()
+    cnn_engine.shutdown()
+    password_pool.shutdown()
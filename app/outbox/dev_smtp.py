@@ -0,0 +1,99 @@
+"""Local stand-in SMTP server for development and tests.
+
+Accepts any login, never relays, and writes each received message to
+``<directory>/<n>.eml``. Point the outbox at it with::
+
+    EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_SSL=false
+
+and run ``python -m app.outbox.dev_smtp --port 1025 --directory /tmp/mail``.
+"""
+
+import argparse
+import itertools
+import os
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self._reply("220 localhost intellicog dev SMTP")
+        recipients: list[str] = []
+        while line := self.rfile.readline():
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-localhost")
+                self._reply("250-AUTH PLAIN")
+                self._reply("250 8BITMIME")
+            elif verb == "HELO":
+                self._reply("250 localhost")
+            elif verb == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[-1].strip(" <>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                self.server.store(self._read_data(), recipients)
+                self._reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _read_data(self) -> bytes:
+        lines = []
+        while (line := self.rfile.readline()) not in (b".\r\n", b".\n", b""):
+            # undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(lines)
+
+
+class DevSMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, directory: str):
+        super().__init__((host, port), _SMTPHandler)
+        self.directory = directory
+        self.messages: list[tuple[list[str], bytes]] = []
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def store(self, data: bytes, recipients: list[str]) -> None:
+        with self._lock:
+            self.messages.append((list(recipients), data))
+            path = os.path.join(self.directory, f"{next(self._counter)}.eml")
+        with open(path, "wb") as file:
+            file.write(data)
+
+    def start_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in SMTP server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--directory", default="dev-mail")
+    args = parser.parse_args()
+    with DevSMTPServer(args.host, args.port, args.directory) as server:
+        print(f"Dev SMTP on {args.host}:{args.port}, saving to {args.directory}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
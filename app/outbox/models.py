@@ -0,0 +1,35 @@
+from ..utils import DraftModel
+from datetime import datetime, timezone
+from enum import Enum as PyEnum
+from sqlalchemy import Text
+from sqlmodel import Field, Column, Enum as SQLEnum, Index
+from typing import Optional
+
+
+class OutboxStatus(PyEnum):
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class OutboxEmail(DraftModel, table=True):
+    __table_args__ = (
+        Index("ix_outboxemail_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    recipient: str = Field(max_length=255)
+    subject: str = Field(default="", max_length=255)
+    message: str = Field(sa_column=Column(Text, nullable=False))
+
+    status: OutboxStatus = Field(
+        default=OutboxStatus.PENDING,
+        sa_column=Column(SQLEnum(OutboxStatus), nullable=False),
+    )
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc)
+    )
+    locked_at: Optional[datetime] = Field(default=None, nullable=True)
+    sent_at: Optional[datetime] = Field(default=None, nullable=True)
+    last_error: Optional[str] = Field(default=None, nullable=True)
@@ -0,0 +1,83 @@
+from ..core.config import config
+from .models import OutboxEmail, OutboxStatus
+from datetime import datetime, timedelta, timezone
+from email.message import Message
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlmodel import Session, select
+
+
+class OutboxService:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enqueue(self, msg: Message, recipient: str) -> OutboxEmail:
+        if not config["EMAIL_SENDER"] or not config["EMAIL_PASSWORD"]:
+            raise HTTPException(
+                status_code=500, detail="Email configuration is not set"
+            )
+        email = OutboxEmail(
+            recipient=recipient,
+            subject=str(msg["Subject"] or "")[:255],
+            message=msg.as_string(),
+        )
+        self.session.add(email)
+        self.session.commit()
+        self.session.refresh(email)
+        # imported lazily: worker.py imports this module
+        from .worker import outbox_worker
+
+        outbox_worker.notify()
+        return email
+
+    def claim_batch(self, limit: int) -> list[OutboxEmail]:
+        now = datetime.now(timezone.utc)
+        lease_expired = now - timedelta(seconds=config["OUTBOX_LEASE_SECONDS"])
+        statement = (
+            select(OutboxEmail)
+            .where(
+                or_(
+                    and_(
+                        OutboxEmail.status == OutboxStatus.PENDING,
+                        OutboxEmail.next_attempt_at <= now,
+                    ),
+                    # batches abandoned by a worker that died mid-send
+                    and_(
+                        OutboxEmail.status == OutboxStatus.SENDING,
+                        OutboxEmail.locked_at < lease_expired,
+                    ),
+                )
+            )
+            .order_by(OutboxEmail.next_attempt_at, OutboxEmail.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        emails = self.session.exec(statement).all()
+        for email in emails:
+            email.status = OutboxStatus.SENDING
+            email.locked_at = now
+            self.session.add(email)
+        self.session.commit()
+        return emails
+
+    def mark_sent(self, email: OutboxEmail) -> None:
+        email.status = OutboxStatus.SENT
+        email.sent_at = datetime.now(timezone.utc)
+        email.last_error = None
+        self.session.add(email)
+        self.session.commit()
+
+    def mark_failed(self, email: OutboxEmail, error: str) -> None:
+        email.attempts += 1
+        email.last_error = error[:1000]
+        if email.attempts >= config["OUTBOX_MAX_ATTEMPTS"]:
+            email.status = OutboxStatus.FAILED
+        else:
+            # exponential backoff: base, 2*base, 4*base, ...
+            delay = config["OUTBOX_BACKOFF_SECONDS"] * 2 ** (email.attempts - 1)
+            email.status = OutboxStatus.PENDING
+            email.next_attempt_at = datetime.now(timezone.utc) + timedelta(
+                seconds=delay
+            )
+        self.session.add(email)
+        self.session.commit()
@@ -0,0 +1,96 @@
+from ..core.config import config
+from ..core.database import engine
+from ..core.workers import PollingWorker
+from .service import OutboxService
+from sqlmodel import Session
+from time import monotonic
+import smtplib
+
+
+class OutboxWorker(PollingWorker):
+    """Delivers queued emails over one warm, authenticated SMTP connection.
+
+    Messages are claimed in batches and sent back to back on the same
+    connection; it is only closed after ``idle_seconds`` without work, so
+    bursts of emails share a single TLS handshake and login. Failed sends
+    are retried with exponential backoff by ``OutboxService.mark_failed``.
+    Runs a single thread: the SMTP connection is not shared.
+    """
+
+    name = "outbox-worker"
+
+    def __init__(self, poll_seconds: float, batch_size: int, idle_seconds: float):
+        super().__init__(workers=1, poll_seconds=poll_seconds)
+        self.batch_size = batch_size
+        self.idle_seconds = idle_seconds
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        if config["EMAIL_USE_SSL"]:
+            smtp = smtplib.SMTP_SSL(config["EMAIL_HOST"], config["EMAIL_PORT"])
+        else:
+            smtp = smtplib.SMTP(config["EMAIL_HOST"], config["EMAIL_PORT"])
+            smtp.ehlo()
+            if smtp.has_extn("starttls"):
+                smtp.starttls()
+                smtp.ehlo()
+        smtp.login(config["EMAIL_SENDER"], config["EMAIL_PASSWORD"])
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def _close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                self._smtp.close()
+            except OSError:
+                pass
+            self._smtp = None
+
+    def _send(self, recipient: str, message: str) -> None:
+        try:
+            self._connection().sendmail(config["EMAIL_SENDER"], [recipient], message)
+        except smtplib.SMTPServerDisconnected:
+            # the server dropped the idle connection; reconnect once
+            self._smtp = None
+            self._connection().sendmail(config["EMAIL_SENDER"], [recipient], message)
+        self._last_used = monotonic()
+
+    def process_once(self) -> bool:
+        with Session(engine) as session:
+            service = OutboxService(session)
+            emails = service.claim_batch(self.batch_size)
+            if not emails:
+                return False
+            for email in emails:
+                try:
+                    self._send(email.recipient, email.message)
+                except Exception as e:
+                    # a bad address or message fails only its own row; the
+                    # connection may be mid-transaction, so start a new one
+                    self._close()
+                    service.mark_failed(email, str(e) or e.__class__.__name__)
+                else:
+                    service.mark_sent(email)
+            return True
+
+    def on_idle(self) -> None:
+        if self._smtp is not None and monotonic() - self._last_used > self.idle_seconds:
+            self._close()
+
+    def stop(self) -> None:
+        super().stop()
+        self._close()
+
+
+outbox_worker = OutboxWorker(
+    poll_seconds=config["OUTBOX_POLL_SECONDS"],
+    batch_size=config["OUTBOX_BATCH_SIZE"],
+    idle_seconds=config["OUTBOX_IDLE_SECONDS"],
+)
@@ -1,9 +1,13 @@
 from ..users.models import User
 from ..utils import DraftModel
 from enum import Enum as PyEnum
-from sqlmodel import Field, Relationship, Column, Enum as SQLEnum, DateTime
+from sqlmodel import Field, Relationship, Column, Enum as SQLEnum, DateTime, Index
+from sqlalchemy import literal_column, text
 from typing import Optional, List
 
+# Must match the expression of ix_patient_full_name_trgm so the planner can use it
+FULL_NAME_SQL = "name || ' ' || last_name"
+
 
 class Sex(PyEnum):
     FEMALE = "FEMALE"
@@ -11,6 +15,22 @@ class Sex(PyEnum):
 
 
 class Patient(DraftModel, table=True):
+    __table_args__ = (
+        Index("ix_patient_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_patient_user_id_dni", "user_id", "dni", unique=True),
+        Index(
+            "ix_patient_full_name_trgm",
+            text(f"({FULL_NAME_SQL}) gin_trgm_ops"),
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_patient_dni_trgm",
+            "dni",
+            postgresql_using="gin",
+            postgresql_ops={"dni": "gin_trgm_ops"},
+        ),
+    )
+
     name: str = Field(max_length=50)
     dni: str = Field(min_items=8)
     last_name: str = Field(max_length=50)
@@ -21,3 +41,7 @@ class Patient(DraftModel, table=True):
 
     user: Optional[User] = Relationship(back_populates="patients")
     evaluations: List["Evaluation"] = Relationship(back_populates="patient")
+
+
+def patient_full_name():
+    return Patient.name + literal_column("' '") + Patient.last_name
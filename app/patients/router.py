@@ -1,12 +1,15 @@
-from ..core.database import SessionDep
+from ..core.conditional import ConditionalDep
+from ..core.database import SessionDep, service_reader
 from ..auth.router import (
+    async_user_service_dependency,
     get_current_user_info,
+    get_current_user_info_async,
     current_user_dependency,
     user_service_dependency,
 )
 from .models import Patient
 from .schemas import PatientModel
-from .service import PatientService
+from .service import AsyncPatientService, PatientService
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from typing import Annotated, Optional
 
@@ -19,6 +22,10 @@ def get_patient_service(session: SessionDep) -> PatientService:
 
 
 patient_service_dependency = Annotated[PatientService, Depends(get_patient_service)]
+# hot reads are async handlers; see service_reader
+async_patient_service_dependency = Annotated[
+    AsyncPatientService, Depends(service_reader(PatientService, AsyncPatientService))
+]
 
 
 @patients_router.post("")
@@ -34,23 +41,53 @@ def create_patient(
 
 
 @patients_router.get("")
-def get_all_patients_of_user(
+async def get_all_patients_of_user(
     tokendata: current_user_dependency,
-    service: patient_service_dependency,
-    user_service: user_service_dependency,
+    service: async_patient_service_dependency,
+    user_service: async_user_service_dependency,
     request: Request,
+    conditional: ConditionalDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     full_name: Optional[str] = Query(None, min_length=1, max_length=100),
     dni: Optional[str] = Query(None, min_length=1, max_length=100),
+    after: Optional[str] = Query(
+        None,
+        max_length=200,
+        description="Pagination cursor; empty for the first page",
+    ),
 ):
-    user_id = get_current_user_info(tokendata, user_service, request)
+    user_id = await get_current_user_info_async(tokendata, user_service, request)
     filters = {}
     if full_name:
         filters["full_name"] = full_name
     if dni:
         filters["dni"] = dni
-    return service.get_all_patients_of_user(user_id, skip, limit, filters=filters)
+    if after is not None:
+        try:
+            patients, next_cursor = await service.get_patients_of_user_after(
+                user_id, after, limit, filters=filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": patients, "next_cursor": next_cursor}
+    last_updated, total = await service.get_patients_fingerprint(user_id, filters)
+    page = (skip, limit, sorted(filters.items()))
+    conditional.check_collection(last_updated, "patients", user_id, total, page)
+    return await service.get_all_patients_of_user(user_id, skip, limit, filters=filters)
+
+
+@patients_router.get("/autocomplete")
+async def autocomplete_patients(
+    tokendata: current_user_dependency,
+    service: async_patient_service_dependency,
+    user_service: async_user_service_dependency,
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+):
+    user_id = await get_current_user_info_async(tokendata, user_service, request)
+    return await service.search_patients(user_id, q, limit=limit)
 
 
 @patients_router.get("/{patient_id}")
@@ -60,8 +97,11 @@ def get_patient(
     service: patient_service_dependency,
     user_service: user_service_dependency,
     request: Request,
+    conditional: ConditionalDep,
 ):
-    return get_patient_by_user(tokendata, service, user_service, patient_id, request)
+    patient = get_patient_by_user(tokendata, service, user_service, patient_id, request)
+    conditional.check(patient.updated_at, "patient", patient.id)
+    return patient
 
 
 @patients_router.put("/{patient_id}")
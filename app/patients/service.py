@@ -1,10 +1,109 @@
-from ..utils import CRUDDraft
-from .models import Patient
+from ..utils import (
+    AsyncService,
+    CRUDDraft,
+    contains_pattern,
+    decode_cursor,
+    encode_cursor,
+)
+from ..evaluations.models import Evaluation
+from ..evaluations.service import EvaluationService
+from .models import Patient, patient_full_name
 from .schemas import PatientModel
+from datetime import datetime
 from sqlmodel import Session, select
+from sqlalchemy import func, or_, tuple_
 from sqlalchemy.orm import selectinload
 
 
+def _patient_conditions(user_id: int, filters: dict) -> list:
+    conditions = [Patient.user_id == user_id]
+    if filters.get("full_name"):
+        conditions.append(
+            patient_full_name().ilike(
+                contains_pattern(filters["full_name"]), escape="\\"
+            )
+        )
+    if filters.get("dni"):
+        conditions.append(
+            Patient.dni.ilike(contains_pattern(filters["dni"]), escape="\\")
+        )
+    return conditions
+
+
+def _patient_to_dict(patient: Patient) -> dict:
+    return {
+        "id": patient.id,
+        "dni": patient.dni,
+        "user_id": patient.user_id,
+        "name": patient.name,
+        "last_name": patient.last_name,
+        "age": patient.age,
+        "sex": patient.sex,
+    }
+
+
+# the list reads build their statements here so PatientService and
+# AsyncPatientService run exactly the same SQL
+
+
+def _fingerprint_query(user_id: int, filters: dict):
+    return select(func.max(Patient.updated_at), func.count(Patient.id)).where(
+        *_patient_conditions(user_id, filters)
+    )
+
+
+def _page_query(user_id: int, skip: int, limit: int, filters: dict):
+    query = (
+        select(Patient)
+        .where(*_patient_conditions(user_id, filters))
+        .order_by(Patient.created_at.desc(), Patient.id.desc())
+        .offset(skip)
+    )
+    if limit:
+        query = query.limit(limit)
+    return query
+
+
+def _after_query(user_id: int, after: str | None, limit: int, filters: dict):
+    conditions = _patient_conditions(user_id, filters)
+    if after:
+        created_at, patient_id = decode_cursor(after)
+        conditions.append(
+            tuple_(Patient.created_at, Patient.id) < tuple_(created_at, patient_id)
+        )
+    return (
+        select(Patient)
+        .where(*conditions)
+        .order_by(Patient.created_at.desc(), Patient.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def _after_page(patients: list[Patient], limit: int) -> tuple[list[dict], str | None]:
+    next_cursor = None
+    if len(patients) > limit:
+        patients = patients[:limit]
+        next_cursor = encode_cursor(patients[-1].created_at, patients[-1].id)
+    return [_patient_to_dict(patient) for patient in patients], next_cursor
+
+
+def _search_query(user_id: int, q: str, limit: int):
+    full_name = patient_full_name()
+    rank = func.greatest(func.similarity(full_name, q), func.similarity(Patient.dni, q))
+    return (
+        select(Patient.id, Patient.dni, Patient.name, Patient.last_name)
+        .where(
+            Patient.user_id == user_id,
+            or_(
+                full_name.ilike(contains_pattern(q), escape="\\"),
+                Patient.dni.ilike(contains_pattern(q), escape="\\"),
+            ),
+        )
+        .order_by(rank.desc(), Patient.id.desc())
+        .limit(limit)
+    )
+
+
 class PatientService:
     def __init__(self, session: Session):
         self.session = session
@@ -32,45 +131,21 @@ class PatientService:
     def get_patient(self, patient_id: int) -> Patient:
         return self.crud.get(patient_id, Patient)
 
-    def get_all_patients_of_user(self, user_id, skip, limit, filters):
-        query = select(Patient).where(Patient.user_id == user_id)
+    def get_patients_fingerprint(
+        self, user_id: int, filters: dict
+    ) -> tuple[datetime | None, int]:
+        return tuple(self.session.exec(_fingerprint_query(user_id, filters)).one())
 
+    def get_all_patients_of_user(self, user_id, skip, limit, filters):
+        query = _page_query(user_id, skip, limit, filters)
         patients: list[Patient] = self.session.exec(query).all()
+        return [_patient_to_dict(patient) for patient in patients]
 
-        if not patients:
-            return []
-        if filters.get("full_name"):
-            patients = [
-                patient
-                for patient in patients
-                if filters["full_name"].lower()
-                in f"{patient.name} {patient.last_name}".lower()
-            ]
-        if filters.get("dni"):
-            patients = [
-                patient
-                for patient in patients
-                if filters["dni"].lower() in patient.dni.lower()
-            ]
-        # add comorbilites to the patient
-        patients_with_com = []
-        for patient in patients:
-            patients_with_com.append(
-                {
-                    "id": patient.id,
-                    "dni": patient.dni,
-                    "user_id": patient.user_id,
-                    "name": patient.name,
-                    "last_name": patient.last_name,
-                    "age": patient.age,
-                    "sex": patient.sex,
-                }
-            )
-        return (
-            patients_with_com[skip : skip + limit]
-            if limit
-            else patients_with_com[skip:]
-        )
+    def get_patients_of_user_after(
+        self, user_id: int, after: str | None, limit: int, filters: dict
+    ) -> tuple[list[dict], str | None]:
+        query = _after_query(user_id, after, limit, filters)
+        return _after_page(self.session.exec(query).all(), limit)
 
     def update_patient(self, patient_id: int, patient_data: PatientModel) -> Patient:
         patient: Patient | None = self.crud.get(patient_id, Patient)
@@ -90,15 +165,46 @@ class PatientService:
         return patient_for_update
 
     def delete_patient(self, patient_id: int) -> Patient:
-        return self.crud.delete(patient_id, Patient)
+        evaluation_service = EvaluationService(self.session)
+        released = evaluation_service.delete_evaluations(
+            Evaluation.patient_id == patient_id
+        )
+        patient = self.crud.delete(patient_id, Patient)
+        evaluation_service.purge_images(released)
+        return patient
 
     def get_patient_by_dni(self, dni: str, user_id) -> Patient | None:
         if not dni:
             return None
-        select_statement = select(Patient).where(Patient.dni == dni)
-        patient: Patient = self.session.exec(select_statement).first()
-        if not patient:
-            return None
-        if patient.user_id != user_id:
-            raise ValueError("Patient does not belong to the user")
-        return patient
+        select_statement = select(Patient).where(
+            Patient.user_id == user_id, Patient.dni == dni
+        )
+        return self.session.exec(select_statement).first()
+
+    def search_patients(self, user_id: int, q: str, limit: int = 10) -> list[dict]:
+        query = _search_query(user_id, q, limit)
+        return [row._asdict() for row in self.session.exec(query).all()]
+
+
+class AsyncPatientService(AsyncService):
+    async def get_patients_fingerprint(
+        self, user_id: int, filters: dict
+    ) -> tuple[datetime | None, int]:
+        result = await self.session.exec(_fingerprint_query(user_id, filters))
+        return tuple(result.one())
+
+    async def get_all_patients_of_user(self, user_id, skip, limit, filters):
+        result = await self.session.exec(_page_query(user_id, skip, limit, filters))
+        return [_patient_to_dict(patient) for patient in result.all()]
+
+    async def get_patients_of_user_after(
+        self, user_id: int, after: str | None, limit: int, filters: dict
+    ) -> tuple[list[dict], str | None]:
+        result = await self.session.exec(_after_query(user_id, after, limit, filters))
+        return _after_page(result.all(), limit)
+
+    async def search_patients(
+        self, user_id: int, q: str, limit: int = 10
+    ) -> list[dict]:
+        result = await self.session.exec(_search_query(user_id, q, limit))
+        return [row._asdict() for row in result.all()]
@@ -0,0 +1,47 @@
+from ..utils import DraftModel
+from datetime import datetime
+from enum import Enum as PyEnum
+from sqlalchemy import LargeBinary, text
+from sqlmodel import Field, Column, Enum as SQLEnum, Index
+from typing import Optional
+
+
+class ReportStatus(PyEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class ReportJob(DraftModel, table=True):
+    __table_args__ = (
+        # at most one active job per identical request: concurrent
+        # requests coalesce onto it
+        Index(
+            "ix_reportjob_active_dedupe_key",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
+        Index("ix_reportjob_status_locked_at", "status", "locked_at"),
+    )
+
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    patient_id: int = Field(foreign_key="patient.id", ondelete="CASCADE")
+    evaluation_id: Optional[int] = Field(
+        default=None, foreign_key="evaluation.id", ondelete="CASCADE", nullable=True
+    )
+    email: Optional[str] = Field(default=None, max_length=100, nullable=True)
+    dedupe_key: str = Field(max_length=255)
+
+    status: ReportStatus = Field(
+        default=ReportStatus.PENDING,
+        sa_column=Column(SQLEnum(ReportStatus), nullable=False),
+    )
+    progress: int = Field(default=0)
+    attempts: int = Field(default=0)
+    locked_at: Optional[datetime] = Field(default=None, nullable=True)
+    error: Optional[str] = Field(default=None, nullable=True)
+    pdf: Optional[bytes] = Field(
+        default=None, sa_column=Column(LargeBinary, nullable=True)
+    )
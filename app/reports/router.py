@@ -0,0 +1,59 @@
+from ..auth.router import (
+    current_user_dependency,
+    get_current_user_info,
+    user_service_dependency,
+)
+from ..core.database import SessionDep
+from .models import ReportStatus
+from .schemas import ReportJobCreate, ReportJobRead
+from .service import ReportService
+from .worker import report_worker
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from typing import Annotated
+
+
+def get_report_service(session: SessionDep) -> ReportService:
+    return ReportService(session)
+
+
+report_service_dependency = Annotated[ReportService, Depends(get_report_service)]
+
+
+reports_router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+@reports_router.post("", status_code=202)
+def create_report_job(
+    tokendata: current_user_dependency,
+    report_data: ReportJobCreate,
+    service: report_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(tokendata, user_service, request)
+    job = service.create_job(user_id, report_data)
+    report_worker.notify()
+    return ReportJobRead.model_validate(job, from_attributes=True)
+
+
+@reports_router.get("/{job_id}")
+def get_report_job(
+    tokendata: current_user_dependency,
+    job_id: int,
+    service: report_service_dependency,
+    user_service: user_service_dependency,
+    request: Request,
+):
+    user_id = get_current_user_info(tokendata, user_service, request)
+    job = service.get_job(job_id, user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job.status == ReportStatus.DONE:
+        return Response(
+            content=job.pdf,
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f"attachment; filename=evaluations_patient_{job.patient_id}.pdf"
+            },
+        )
+    return ReportJobRead.model_validate(job, from_attributes=True)
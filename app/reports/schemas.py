@@ -0,0 +1,20 @@
+from .models import ReportStatus
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ReportJobCreate(BaseModel):
+    patient_id: int
+    evaluation_id: Optional[int] = None
+    email: Optional[str] = None
+
+
+class ReportJobRead(BaseModel):
+    id: int
+    status: ReportStatus
+    progress: int
+    patient_id: int
+    evaluation_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,172 @@
+from ..core.config import config
+from ..evaluations.models import Evaluation
+from ..evaluations.service import EvaluationService, send_pdf_report_email
+from ..patients.models import Patient
+from ..utils import CRUDDraft
+from .models import ReportJob, ReportStatus
+from .schemas import ReportJobCreate
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+from sqlmodel import Session, select
+
+
+class ReportService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.crud = CRUDDraft(self.session)
+
+    def create_job(self, user_id: int, report_data: ReportJobCreate) -> ReportJob:
+        patient: Patient | None = self.session.get(Patient, report_data.patient_id)
+        if not patient or patient.user_id != user_id:
+            raise HTTPException(
+                status_code=404, detail="Paciente no encontrado o no autorizado"
+            )
+        if report_data.evaluation_id:
+            evaluation = self.session.get(Evaluation, report_data.evaluation_id)
+            if not evaluation or evaluation.patient_id != patient.id:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Evaluación no encontrada para este paciente",
+                )
+        else:
+            has_evaluations = self.session.exec(
+                select(Evaluation.id).where(Evaluation.patient_id == patient.id)
+            ).first()
+            if not has_evaluations:
+                raise HTTPException(
+                    status_code=404, detail="El paciente no tiene evaluaciones"
+                )
+
+        dedupe_key = ":".join(
+            [
+                str(user_id),
+                str(patient.id),
+                str(report_data.evaluation_id or "*"),
+                report_data.email or "",
+            ]
+        )
+        existing_job = self.get_active_job(dedupe_key)
+        if existing_job:
+            return existing_job
+
+        job = ReportJob(
+            user_id=user_id,
+            patient_id=patient.id,
+            evaluation_id=report_data.evaluation_id,
+            email=report_data.email,
+            dedupe_key=dedupe_key,
+        )
+        try:
+            return self.crud.create(job, ReportJob)
+        except IntegrityError:
+            # a concurrent request created the same job first
+            self.session.rollback()
+            return self.get_active_job(dedupe_key)
+
+    def get_active_job(self, dedupe_key: str) -> ReportJob | None:
+        statement = (
+            select(ReportJob)
+            .where(
+                ReportJob.dedupe_key == dedupe_key,
+                ReportJob.status.in_([ReportStatus.PENDING, ReportStatus.RUNNING]),
+            )
+            .options(defer(ReportJob.pdf))
+        )
+        return self.session.exec(statement).first()
+
+    def get_job(self, job_id: int, user_id: int) -> ReportJob | None:
+        statement = (
+            select(ReportJob)
+            .where(ReportJob.id == job_id, ReportJob.user_id == user_id)
+            .options(defer(ReportJob.pdf))
+        )
+        return self.session.exec(statement).first()
+
+    def claim_next_job(self) -> ReportJob | None:
+        now = datetime.now(timezone.utc)
+        lease_expired = now - timedelta(seconds=config["REPORT_JOB_LEASE_SECONDS"])
+        # jobs whose last allowed attempt died: they can never be claimed
+        # again, and while RUNNING they would keep the dedupe key taken
+        self.session.execute(
+            update(ReportJob)
+            .where(
+                ReportJob.status == ReportStatus.RUNNING,
+                ReportJob.locked_at < lease_expired,
+                ReportJob.attempts >= config["REPORT_JOB_MAX_ATTEMPTS"],
+            )
+            .values(
+                status=ReportStatus.FAILED,
+                error="The report was interrupted too many times",
+                updated_at=now,
+            )
+        )
+        statement = (
+            select(ReportJob)
+            .where(
+                ReportJob.attempts < config["REPORT_JOB_MAX_ATTEMPTS"],
+                or_(
+                    ReportJob.status == ReportStatus.PENDING,
+                    # jobs whose worker died mid-render (restart, crash)
+                    and_(
+                        ReportJob.status == ReportStatus.RUNNING,
+                        ReportJob.locked_at < lease_expired,
+                    ),
+                ),
+            )
+            .order_by(ReportJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .options(defer(ReportJob.pdf))
+        )
+        job = self.session.exec(statement).first()
+        if not job:
+            self.session.commit()
+            return None
+        job.status = ReportStatus.RUNNING
+        job.locked_at = now
+        job.attempts += 1
+        job.progress = 0
+        self.session.add(job)
+        self.session.commit()
+        return job
+
+    def run_job(self, job: ReportJob) -> None:
+        try:
+            evaluation_service = EvaluationService(self.session)
+            patient = self.session.get(Patient, job.patient_id)
+            if job.evaluation_id:
+                evaluations = [evaluation_service.get_evaluation(job.evaluation_id)]
+            else:
+                evaluations = evaluation_service.get_evaluations_by_patient(
+                    job.patient_id
+                )
+            self._set_progress(job, 30)
+
+            pdf_bytes = evaluation_service.generate_evaluations_pdf(
+                patient, evaluations
+            )
+            if job.email:
+                self._set_progress(job, 90)
+                send_pdf_report_email(
+                    self.session, job.email, pdf_bytes, job.patient_id
+                )
+            job.pdf = pdf_bytes
+            job.status = ReportStatus.DONE
+            job.progress = 100
+            self.session.add(job)
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            job.status = ReportStatus.FAILED
+            job.error = str(e) or e.__class__.__name__
+            self.session.add(job)
+            self.session.commit()
+
+    def _set_progress(self, job: ReportJob, progress: int) -> None:
+        job.progress = progress
+        job.locked_at = datetime.now(timezone.utc)
+        self.session.add(job)
+        self.session.commit()
@@ -0,0 +1,30 @@
+from ..core.config import config
+from ..core.database import engine
+from ..core.workers import PollingWorker
+from .service import ReportService
+from sqlmodel import Session
+
+
+class ReportWorker(PollingWorker):
+    """Renders queued report jobs.
+
+    Jobs live in the ``reportjob`` table, so any API process can pick them
+    up and unfinished jobs are resumed after a restart once their lease
+    expires.
+    """
+
+    name = "report-worker"
+
+    def process_once(self) -> bool:
+        with Session(engine) as session:
+            service = ReportService(session)
+            job = service.claim_next_job()
+            if not job:
+                return False
+            service.run_job(job)
+            return True
+
+
+report_worker = ReportWorker(
+    workers=config["REPORT_WORKERS"], poll_seconds=config["REPORT_POLL_SECONDS"]
+)
@@ -0,0 +1,164 @@
+from ..core.config import config
+from abc import ABC, abstractmethod
+import mimetypes
+import os
+import tempfile
+
+
+class StorageDriver(ABC):
+    """Where blobs live. Keys are content-derived file names.
+
+    ``put`` consumes a file already written under ``staging_dir`` and makes
+    it visible under ``key`` atomically, so readers never see a partial
+    blob. ``local_path`` returns a readable local copy (the model and the
+    thumbnailer work on files), fetching it first if the driver is remote.
+    """
+
+    staging_dir: str
+
+    @abstractmethod
+    def put(self, source: str, key: str) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def local_path(self, key: str) -> str: ...
+
+    @abstractmethod
+    def cached_path(self, key: str) -> str:
+        # path of the local copy, whether it exists or not; downloads nothing
+        ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+    def staging_file(self, suffix: str = "") -> str:
+        fd, path = tempfile.mkstemp(dir=self.staging_dir, suffix=suffix)
+        os.close(fd)
+        return path
+
+
+class LocalStorageDriver(StorageDriver):
+    def __init__(self, root: str, public_url: str):
+        self.root = root
+        self.public_url = public_url.rstrip("/")
+        # inside root so the final rename does not cross filesystems
+        self.staging_dir = os.path.join(root, ".staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def put(self, source: str, key: str) -> None:
+        dest = self.cached_path(key)
+        # prefixed keys (e.g. imports) live in a subdirectory
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(source, dest)
+
+    def delete(self, key: str) -> None:
+        path = self.cached_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def local_path(self, key: str) -> str:
+        return self.cached_path(key)
+
+    def cached_path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+class S3StorageDriver(StorageDriver):
+    """S3-compatible bucket with a local read-through copy of each blob.
+
+    ``endpoint_url`` points it at any S3-compatible server (the ``minio``
+    service in docker-compose.yml works as a local stand-in).
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        region: str,
+        access_key_id: str,
+        secret_access_key: str,
+        endpoint_url: str | None,
+        cache_dir: str,
+    ):
+        # boto3 is only needed with STORAGE_DRIVER=s3
+        import boto3
+
+        self.bucket = bucket
+        self.region = region
+        self.endpoint_url = endpoint_url.rstrip("/") if endpoint_url else None
+        self.client = boto3.client(
+            "s3",
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            endpoint_url=self.endpoint_url,
+        )
+        self.cache_dir = cache_dir
+        self.staging_dir = os.path.join(cache_dir, ".staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def put(self, source: str, key: str) -> None:
+        # an S3 PUT is atomic: the object appears whole or not at all
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_file(
+            source,
+            self.bucket,
+            key,
+            ExtraArgs={
+                "ContentType": content_type,
+                "CacheControl": "public, max-age=31536000, immutable",
+            },
+        )
+        dest = self.cached_path(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(source, dest)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        path = self.cached_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def cached_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def local_path(self, key: str) -> str:
+        path = self.cached_path(key)
+        if not os.path.exists(path):
+            tmp_path = self.staging_file()
+            try:
+                self.client.download_file(self.bucket, key, tmp_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return path
+
+    def url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{self.bucket}/{key}"
+        return f"https://{self.bucket}.s3.{self.region}.amazonaws.com/{key}"
+
+
+def create_driver() -> StorageDriver:
+    if config["STORAGE_DRIVER"] == "s3":
+        return S3StorageDriver(
+            bucket=config["S3_BUCKET_NAME"],
+            region=config["S3_REGION_NAME"],
+            access_key_id=config["S3_ACCESS_KEY_ID"],
+            secret_access_key=config["S3_SECRET_ACCESS_KEY"],
+            endpoint_url=config["S3_ENDPOINT_URL"],
+            cache_dir=config["STORAGE_CACHE_DIR"],
+        )
+    return LocalStorageDriver(
+        root=config["STORAGE_LOCAL_ROOT"], public_url=config["STORAGE_PUBLIC_URL"]
+    )
+
+
+storage = create_driver()
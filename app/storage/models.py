@@ -0,0 +1,7 @@
+from ..utils import DraftModel
+from sqlmodel import Field
+
+
+class StoredBlob(DraftModel, table=True):
+    key: str = Field(max_length=255, unique=True)
+    refcount: int = Field(default=0)
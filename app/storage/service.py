@@ -0,0 +1,85 @@
+from .drivers import storage
+from .models import StoredBlob
+from datetime import datetime, timezone
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+import os
+
+
+class StorageService:
+    """Reference-counted, content-addressed blobs.
+
+    ``acquire`` and ``release`` take the blob's lock and leave the
+    transaction open; the caller commits together with the rows that point
+    at the blob. Files are never deleted inside that transaction: once it
+    has committed (or rolled back) the caller passes the keys that may have
+    lost their last reference to ``purge``, which deletes a file only if no
+    row references it any more. The lock is a transaction-level advisory
+    lock on the key, so it also covers keys whose row does not exist yet.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _lock(self, key: str):
+        self.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(key))))
+
+    def acquire(self, source: str, key: str) -> bool:
+        """Add one reference; returns True if the file was uploaded.
+
+        If the transaction is then rolled back, the uploaded keys must be
+        passed to ``purge``.
+        """
+        self._lock(key)
+        now = datetime.now(timezone.utc)
+        refcount = self.session.execute(
+            insert(StoredBlob)
+            .values(key=key, refcount=1, created_at=now, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=["key"],
+                set_={"refcount": StoredBlob.refcount + 1, "updated_at": now},
+            )
+            .returning(StoredBlob.refcount)
+        ).scalar_one()
+        if refcount == 1:
+            storage.put(source, key)
+            return True
+        os.remove(source)
+        return False
+
+    def release(self, key: str) -> bool:
+        """Drop one reference; returns True if it was the last one.
+
+        The file itself is removed by ``purge`` after the commit.
+        """
+        self._lock(key)
+        refcount = self.session.execute(
+            update(StoredBlob)
+            .where(StoredBlob.key == key)
+            .values(refcount=StoredBlob.refcount - 1)
+            .returning(StoredBlob.refcount)
+        ).scalar_one_or_none()
+        if refcount is None or refcount > 0:
+            return False
+        self.session.execute(delete(StoredBlob).where(StoredBlob.key == key))
+        return True
+
+    def purge(self, keys: list[str]) -> list[str]:
+        """Delete the files of ``keys`` that no row references; returns them.
+
+        Runs one short transaction per key, outside the caller's.
+        """
+        borradas = []
+        for key in keys:
+            try:
+                self._lock(key)
+                referenciada = self.session.exec(
+                    select(StoredBlob.id).where(StoredBlob.key == key)
+                ).first()
+                if referenciada is None:
+                    storage.delete(key)
+                    borradas.append(key)
+            finally:
+                self.session.commit()
+        return borradas
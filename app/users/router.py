@@ -1,4 +1,5 @@
 from ..auth.router import current_user_dependency, get_current_user_info
+from ..core.conditional import ConditionalDep
 from ..core.database import SessionDep
 from .schemas import UserForChangePassword, UserForUpdate, UserGet
 from .service import UserService
@@ -23,6 +24,7 @@ def get_user(
     tokendata: current_user_dependency,
     service: user_service_dependency,
     request: Request,
+    conditional: ConditionalDep,
 ):
     user_id = get_current_user_info(tokendata, service, request)
     if not user_id:
@@ -30,6 +32,7 @@ def get_user(
     user = service.get_user(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    conditional.check(user.updated_at, "user", user.id)
     user_get = UserGet(
         email=user.email,
         name=user.name,
@@ -1,21 +1,29 @@
 from ..auth.utils import verify_password, hash_password
-from ..utils import CRUDDraft
+from ..utils import AsyncService, CRUDDraft
 from .models import User
 from .schemas import UserForChangePassword, UserForUpdate
 from fastapi import HTTPException, status
-from sqlmodel import Session
+from sqlmodel import Session, select
 from pydantic import BaseModel
+from ..core.cache import TTLCache
 from ..core.config import config
-import smtplib
+from ..outbox.service import OutboxService
 from email.message import EmailMessage
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email.mime.text import MIMEText
 from email import encoders
 from ..evaluations.models import Evaluation
+from ..evaluations.service import EvaluationService
 from ..patients.models import Patient
 
 
+# user id -> id of an existing user, checked on every authenticated request
+user_cache = TTLCache(
+    maxsize=config["USER_CACHE_MAXSIZE"], ttl=config["USER_CACHE_TTL_SECONDS"]
+)
+
+
 class SupportTechnical(BaseModel):
     asunto: str
     texto: str
@@ -42,19 +50,26 @@ class UserService:
         if user_data.email is None:
             user_data.email = user.email
 
-        return self.crud.update(user_id, User, user_data)
+        user = self.crud.update(user_id, User, user_data)
+        # after the commit, so a concurrent request can't re-cache the old row
+        user_cache.invalidate(user_id)
+        return user
 
     def delete_user(self, user_id: int) -> User:
-        # delete all evaluations and patients associated with the user
-        patients = self.crud.get_all_by_foreign_key(user_id, Patient, "user_id")
-        for patient in patients:
-            evaluations = self.crud.get_all_by_foreign_key(
-                patient.id, Evaluation, "patient_id"
+        # delete all evaluations and patients associated with the user, in the
+        # same transaction as the user; blobs are purged after the commit
+        evaluation_service = EvaluationService(self.session)
+        released = evaluation_service.delete_evaluations(
+            Evaluation.patient_id.in_(
+                select(Patient.id).where(Patient.user_id == user_id)
             )
-            for evaluation in evaluations:
-                self.crud.delete(evaluation.id, Evaluation)
-            self.crud.delete(patient.id, Patient)
-        return self.crud.delete(user_id, User)
+        )
+        for patient in self.crud.get_all_by_foreign_key(user_id, Patient, "user_id"):
+            self.session.delete(patient)
+        user = self.crud.delete(user_id, User)
+        user_cache.invalidate(user_id)
+        evaluation_service.purge_images(released)
+        return user
 
     def get_user(self, user_id: int) -> User | None:
         return self.crud.get(user_id, User)
@@ -84,7 +99,9 @@ class UserService:
                 detail="New password and verify new password do not match",
             )
         user.password = hash_password(user_data.new_password)
-        return self.crud.update(user_id, User, user)
+        user = self.crud.update(user_id, User, user)
+        user_cache.invalidate(user_id)
+        return user
 
     def send_support_email(
         self, email: str, name: str, last_name: str, correo: SupportTechnical
@@ -95,6 +112,9 @@ class UserService:
         msg["Subject"] = correo.asunto
         body = f"Nombre: {name} {last_name}\n\n{correo.texto}"
         msg.attach(MIMEText(body, "plain"))
-        with smtplib.SMTP_SSL(config["EMAIL_HOST"], config["EMAIL_PORT"]) as smtp:
-            smtp.login(config["EMAIL_SENDER"], config["EMAIL_PASSWORD"])
-            smtp.sendmail(config["EMAIL_SENDER"], [email], msg.as_string())
+        OutboxService(self.session).enqueue(msg, email)
+
+
+class AsyncUserService(AsyncService):
+    async def get_user(self, user_id: int) -> User | None:
+        return await self.crud.get(user_id, User)
@@ -1,6 +1,9 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, timezone
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import SQLModel, Field, Session, select
-from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, Optional
 
 
 class DraftModel(SQLModel):
@@ -31,12 +34,13 @@ class CRUDDraft:
         return obj
 
     def get(self, id: int, model: DraftModel) -> Optional[DraftModel]:
-        return self.session.exec(select(model).where(model.id == id)).first()
+        # served from the session identity map when already loaded
+        return self.session.get(model, id)
 
     def update(
         self, id: int, model: DraftModel, data: SQLModel
     ) -> Optional[DraftModel]:
-        existing_obj = self.session.exec(select(model).where(model.id == id)).first()
+        existing_obj = self.session.get(model, id)
         if not existing_obj:
             return None
 
@@ -48,7 +52,7 @@ class CRUDDraft:
         return existing_obj
 
     def delete(self, id: int, model: DraftModel) -> Optional[DraftModel]:
-        obj = self.session.exec(select(model).where(model.id == id)).first()
+        obj = self.session.get(model, id)
         if not obj:
             return None
         self.session.delete(obj)
@@ -70,3 +74,110 @@ class CRUDDraft:
             getattr(model, foreign_key_field) == foreign_key_value
         )
         return self.session.exec(query).all()
+
+
+class AsyncCRUDDraft:
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, obj: SQLModel, model: type[DraftModel]) -> DraftModel:
+        obj = model(**obj.model_dump(exclude_unset=True))
+        self.session.add(obj)
+        await self.session.commit()
+        await self.session.refresh(obj)
+        return obj
+
+    async def get(self, id: int, model: DraftModel) -> Optional[DraftModel]:
+        return await self.session.get(model, id)
+
+    async def update(
+        self, id: int, model: DraftModel, data: SQLModel
+    ) -> Optional[DraftModel]:
+        existing_obj = await self.session.get(model, id)
+        if not existing_obj:
+            return None
+
+        for key, value in data.model_dump(exclude_unset=True).items():
+            setattr(existing_obj, key, value)
+        self.session.add(existing_obj)
+        await self.session.commit()
+        await self.session.refresh(existing_obj)
+        return existing_obj
+
+    async def delete(self, id: int, model: DraftModel) -> Optional[DraftModel]:
+        obj = await self.session.get(model, id)
+        if not obj:
+            return None
+        await self.session.delete(obj)
+        await self.session.commit()
+        return obj
+
+    async def get_by_foreign_key(
+        self, foreign_key_value: int, model: DraftModel, foreign_key_field: str
+    ) -> Optional[DraftModel]:
+        query = select(model).where(
+            getattr(model, foreign_key_field) == foreign_key_value
+        )
+        return (await self.session.exec(query)).first()
+
+    async def get_all_by_foreign_key(
+        self, foreign_key_value: int, model: DraftModel, foreign_key_field: str
+    ) -> list[DraftModel]:
+        query = select(model).where(
+            getattr(model, foreign_key_field) == foreign_key_value
+        )
+        return (await self.session.exec(query)).all()
+
+
+class AsyncService:
+    """Base of the async services used with ``DB_ASYNC``.
+
+    Subclasses implement, natively on the AsyncSession, the methods that
+    async handlers await; the rest of the API stays on the sync service.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.crud = AsyncCRUDDraft(session)
+
+
+class ThreadpoolService:
+    """Same awaitable interface as an ``AsyncService`` over a sync service.
+
+    Used by async handlers on deployments without ``DB_ASYNC``: each call
+    runs the sync method on the threadpool, as a sync handler would.
+    """
+
+    def __init__(self, service: Any):
+        self.service = service
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.service, name, None)
+        if not callable(method) or name.startswith("_"):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(method, *args, **kwargs)
+
+        return call
+
+
+def contains_pattern(value: str) -> str:
+    # escape LIKE wildcards so user input is matched literally
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,99 @@
+"""Peak RSS per MRI upload: in-memory ingestion vs streaming ingestion.
+
+Each variant runs in a fresh process so ``ru_maxrss`` reflects only that
+upload. Run from the repository root:
+
+    python -m benchmarks.mri_ingest [--size 8000] [--format JPEG]
+"""
+
+import argparse
+import asyncio
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+
+from PIL import Image
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class _Upload:
+    # minimal stand-in for starlette's UploadFile read() API
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+
+def _legacy(source: str, out_dir: str, queue) -> None:
+    # the pre-streaming upload: whole body in memory, always expanded to RGBA
+    from app.evaluations.utils import guardar_imagen_png
+
+    base = _peak_rss_mb()
+    with open(source, "rb") as f:
+        content = f.read()
+    guardar_imagen_png(Image.open(io.BytesIO(content)).convert("RGBA"), out_dir)
+    queue.put(_peak_rss_mb() - base)
+
+
+def _streaming(source: str, out_dir: str, queue) -> None:
+    from app.core.config import config
+    from app.evaluations.utils import process_image_png, receive_image
+
+    base = _peak_rss_mb()
+    tmp_path, _ = asyncio.run(
+        receive_image(_Upload(source), config["MRI_MAX_UPLOAD_BYTES"])
+    )
+    try:
+        # with the renditions, as the upload endpoint does
+        process_image_png(
+            tmp_path,
+            out_dir,
+            config["MRI_MAX_DIMENSION"],
+            config["MRI_MAX_PIXELS"],
+            config["MRI_RENDITION_SIZES"],
+            config["MRI_WEBP_QUALITY"],
+            config["MRI_WEBP_FULL_MAX_PIXELS"],
+        )
+    finally:
+        os.remove(tmp_path)
+    queue.put(_peak_rss_mb() - base)
+
+
+def _run(target, source: str, out_dir: str) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(source, out_dir, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=6000, help="side in pixels")
+    parser.add_argument("--format", default="JPEG", choices=["JPEG", "PNG"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"scan.{args.format.lower()}")
+        Image.linear_gradient("L").resize((args.size, args.size)).save(
+            source, format=args.format
+        )
+        print(
+            f"input: {args.size}x{args.size} {args.format}, "
+            f"{os.path.getsize(source) / 1024 / 1024:.1f} MiB"
+        )
+        for name, target in (("in-memory", _legacy), ("streaming", _streaming)):
+            print(f"{name:>10}: peak RSS +{_run(target, source, tmp):.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Login throughput of bcrypt verification, in-process vs the password pool.
+
+Verifying a bcrypt hash is what dominates a login request. The "inline"
+path verifies on the calling request threads, as the handlers used to; the
+"pool" path goes through ``verify_password``, which runs on
+``password_pool``. Run from the repository root:
+
+    python -m benchmarks.password_hashing [--logins 64] [--threads 8]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.auth.utils import (
+    _verify_and_update,
+    hash_password,
+    password_pool,
+    verify_password,
+)
+from app.core.config import config
+
+
+def _inline(password: str, hashed: str) -> bool:
+    return _verify_and_update(password, hashed)[0]
+
+
+def _measure(verify, hashed: str, logins: int, threads: int) -> float:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        results = list(
+            executor.map(lambda _: verify("s3cret-password", hashed), range(logins))
+        )
+        elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    hashed = hash_password("s3cret-password")  # also warms the pool up
+    workers = config["PASSWORD_HASH_WORKERS"]
+    print(
+        f"bcrypt rounds {config['BCRYPT_ROUNDS']}, {os.cpu_count()} cpus, "
+        f"{workers} pool workers, {args.threads} request threads"
+    )
+    for name, verify, cores in (
+        ("inline", _inline, 1),
+        ("pool", verify_password, workers),
+    ):
+        rate = _measure(verify, hashed, args.logins, args.threads)
+        print(f"{name:>6}: {rate:.1f} logins/s, {rate / cores:.1f} logins/s per core")
+    password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
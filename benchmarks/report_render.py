@@ -0,0 +1,99 @@
+"""Per-render time of the evaluations PDF: ad-hoc setup vs the registry.
+
+The "before" path reproduces the old per-call work (read the template,
+compile a fresh ``jinja2.Template``, parse the stylesheet and build a new
+``FontConfiguration``); the "after" path uses ``report_renderer``. Run from
+the repository root:
+
+    python -m benchmarks.report_render [--renders 20] [--evaluations 30]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from jinja2 import Template
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+from app.evaluations.models import Classification, Modality
+from app.evaluations.rendering import report_renderer
+from app.evaluations.service import formatear_fecha, traducir_enum
+
+
+def _context(evaluations_count: int) -> dict:
+    patient = SimpleNamespace(name="Ana", last_name="Quispe", dni="45873210")
+    now = datetime.now()
+    evaluations = [
+        SimpleNamespace(
+            id=index,
+            created_at=now - timedelta(days=index),
+            modality=Modality.CNN if index % 2 else Modality.RF,
+            model_classification=Classification.MCI,
+            manual_classification=Classification.NORMAL,
+            model_probability=Decimal("0.873"),
+        )
+        for index in range(evaluations_count)
+    ]
+    evaluations_results = [
+        {"id": index + 1, "description": "Sin cambios.", "created_at": ev.created_at}
+        for index, ev in enumerate(evaluations)
+    ]
+    return {
+        "patient": patient,
+        "evaluations": evaluations,
+        "traducir_enum": traducir_enum,
+        "formatear_fecha": formatear_fecha,
+        "evaluations_results": evaluations_results,
+    }
+
+
+def _render_before(context: dict) -> bytes:
+    template_dir = report_renderer.template_dir
+    with open(
+        os.path.join(template_dir, report_renderer.template_name), encoding="utf-8"
+    ) as file:
+        template = Template(file.read())
+    font_config = FontConfiguration()
+    css = CSS(filename=report_renderer.stylesheet_path, font_config=font_config)
+    return HTML(string=template.render(**context)).write_pdf(
+        stylesheets=[css], font_config=font_config
+    )
+
+
+def _render_after(context: dict) -> bytes:
+    return report_renderer.render_pdf(**context)
+
+
+def _measure(render, context: dict, renders: int) -> list[float]:
+    render(context)  # warm-up
+    timings = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        render(context)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--evaluations", type=int, default=30)
+    args = parser.parse_args()
+
+    context = _context(args.evaluations)
+    report_renderer.load()
+    for name, render in (("before", _render_before), ("after", _render_after)):
+        timings = _measure(render, context, args.renders)
+        print(
+            f"{name:>6}: median {statistics.median(timings):.1f} ms, "
+            f"min {min(timings):.1f} ms over {args.renders} renders"
+        )
+
+
+if __name__ == "__main__":
+    main()